@@ -3,6 +3,15 @@ Modified L3AGI Components with XAgent Integration
 Enhanced L3AGI components powered by XAgent autonomous capabilities
 """
 
+import asyncio
+
+# Use libuv-based event loop when available (drop-in replacement for asyncio's default)
+try:
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+except ImportError:
+    pass
+
 from .conversational import ConversationalAgent, TeamConversationalAgent, create_conversational_agent
 from .dialogue_agent_with_tools import DialogueAgentWithTools, TeamDialogueAgent, ToolManager, create_dialogue_agent
 
@@ -6,12 +6,38 @@ Replaces Langchain REACT Agent with XAgent for L3AGI Framework
 import asyncio
 import json
 import logging
-from typing import Any, Dict, List, Optional
+import string
+import time
+from collections import deque, namedtuple
+from typing import Any, AsyncIterator, Dict, List, Optional
 from datetime import datetime
 
 # XAgent integration imports
+from xagent_integration.history_store import HistoryStore
 from xagent_integration.l3agi_compatibility import ConversationalXAgent
-from xagent_integration.xagent_core import AgentMessage
+from xagent_integration.xagent_core import AgentMessage, _AgentLoggerAdapter, _ResponseCache
+
+logger = logging.getLogger("L3AGI.Conversational")
+
+# Context keys whose contents are fully captured by the prepared context (safe to cache)
+_CACHEABLE_CONTEXT_KEYS = frozenset({"previous_messages", "team_context"})
+
+# Options consumed by the agent itself; everything else is forwarded to the XAgent backend
+_AGENT_KWARGS = frozenset({
+    "max_history", "max_concurrency", "cache_responses", "response_cache_size", "response_cache_ttl"
+})
+
+# Compact history record; get_memory() materializes dicts on demand
+HistoryEntry = namedtuple("HistoryEntry", "timestamp user_message agent_response context cached")
+
+_DEFAULT_SYSTEM_PROMPT = "You are a helpful AI assistant that collaborates effectively with other agents."
+
+_TEAM_PROMPT_TEMPLATE = string.Template("""
+$base
+
+You are part of a team of AI agents. Your specific role is: $role
+Collaborate effectively with other team members and maintain team context.
+""")
 
 class ConversationalAgent:
     """
@@ -19,16 +45,27 @@ class ConversationalAgent:
     Maintains L3AGI interface while leveraging XAgent capabilities
     """
     
+    # Instantiated per user/session - slots drop the per-instance __dict__
+    __slots__ = (
+        "name", "system_prompt", "memory_enabled", "tools", "xagent",
+        "conversation_history", "_history_view", "_store",
+        "_sem", "_response_cache", "logger", "__weakref__"
+    )
+    
     def __init__(self, 
                  name: str = "ConversationalAgent",
                  system_prompt: str = None,
                  memory_enabled: bool = True,
                  tools: List[Any] = None,
+                 history_store: HistoryStore = None,
                  **kwargs):
-        """Initialize conversational agent with XAgent backend"""
+        """
+        Initialize conversational agent with XAgent backend
+        Pass a history_store (e.g. RedisStore / SQLiteStore) to share sessions across workers
+        """
         
         self.name = name
-        self.system_prompt = system_prompt or "You are a helpful AI assistant that collaborates effectively with other agents."
+        self.system_prompt = system_prompt or _DEFAULT_SYSTEM_PROMPT
         self.memory_enabled = memory_enabled
         self.tools = tools or []
         
@@ -38,13 +75,31 @@ class ConversationalAgent:
             system_prompt=self.system_prompt,
             tools=self.tools,
             memory_config={"enabled": memory_enabled},
-            **kwargs
+            **{key: value for key, value in kwargs.items() if key not in _AGENT_KWARGS}
         )
+        # Share one tools list with the backend so mutations stay in sync
+        self.xagent.tools = self.tools
+        
+        # Bounded history - only the most recent exchanges are ever read back
+        self.conversation_history = deque(maxlen=kwargs.get("max_history", 1024))
         
-        self.conversation_history = []
-        self.logger = logging.getLogger(f"L3AGI.Conversational.{name}")
+        # Rolling role/content view of the last 5 exchanges, kept in step with history
+        self._history_view = deque(maxlen=2 * min(5, self.conversation_history.maxlen))
         
-        self.logger.info(f"Conversational Agent {name} initialized with XAgent backend")
+        # Optional shared store; when set it is the source of truth for recent context
+        self._store = history_store
+        
+        # Bound in-flight backend requests under burst load
+        self._sem = asyncio.Semaphore(kwargs.get("max_concurrency", 32))
+        
+        # Opt-in (cache_responses=True): skip identical prompts (system prompt + recent context + message)
+        self._response_cache = _ResponseCache(
+            maxsize=kwargs.get("response_cache_size", 4096),
+            ttl=kwargs.get("response_cache_ttl", 600)
+        ) if kwargs.get("cache_responses", False) else None
+        self.logger = _AgentLoggerAdapter(logger, {"agent_name": name})
+        
+        self.logger.info("Conversational Agent %s initialized with XAgent backend", name)
     
     async def chat(self, message: str, context: Dict[str, Any] = None) -> str:
         """
@@ -53,39 +108,85 @@ class ConversationalAgent:
         """
         try:
             # Prepare context for XAgent
-            chat_context = self._prepare_context(context)
+            chat_context = await self._prepare_context(context)
             
-            # Execute with XAgent backend
-            response = await self.xagent.chat(message, chat_context)
+            cache_key = None
+            if self._response_cache is not None and (not context or context.keys() <= _CACHEABLE_CONTEXT_KEYS):
+                cache_key = _ResponseCache.make_key(self.system_prompt, chat_context, message)
+                cached_response = self._response_cache.get(cache_key)
+                if cached_response is not None:
+                    await self._record_turn(message, cached_response, context, cached=True)
+                    self.logger.info("Chat served from cache: %d chars", len(cached_response))
+                    return cached_response
             
-            # Store in conversation history if memory enabled
-            if self.memory_enabled:
-                self.conversation_history.append({
-                    "timestamp": datetime.now().isoformat(),
-                    "user_message": message,
-                    "agent_response": response,
-                    "context": context
-                })
+            # Execute with XAgent backend (bounded in-flight; the backend micro-batches)
+            async with self._sem:
+                response = await self.xagent.chat(message, chat_context)
+            
+            # The backend raises on failure, so only successful responses get here
+            if cache_key is not None:
+                self._response_cache.set(cache_key, response)
+            
+            await self._record_turn(message, response, context)
             
-            self.logger.info(f"Chat completed successfully: {len(response)} chars")
+            self.logger.info("Chat completed successfully: %d chars", len(response))
             return response
             
         except Exception as e:
-            error_msg = f"Conversational chat failed: {str(e)}"
-            self.logger.error(error_msg)
+            self.logger.error("Conversational chat failed: %s", e)
             return f"I apologize, but I encountered an error: {str(e)}"
     
-    def _prepare_context(self, context: Dict[str, Any] = None) -> List[Dict]:
+    async def chat_stream(self, message: str, context: Dict[str, Any] = None) -> AsyncIterator[str]:
+        """
+        Streaming chat - yields response tokens as XAgent produces them
+        History is recorded once the full response has been streamed
+        """
+        tokens = []
+        try:
+            chat_context = await self._prepare_context(context)
+            
+            async with self._sem:
+                async for token in self.xagent.chat_stream(message, chat_context):
+                    tokens.append(token)
+                    yield token
+            
+            response = "".join(tokens)
+            await self._record_turn(message, response, context)
+            self.logger.info("Chat stream completed successfully: %d chars", len(response))
+            
+        except Exception as e:
+            self.logger.error("Conversational chat stream failed: %s", e)
+            yield f"I apologize, but I encountered an error: {str(e)}"
+    
+    async def _record_turn(self, message: str, response: str, context: Dict[str, Any] = None, cached: bool = False):
+        """Store an exchange in conversation history if memory enabled"""
+        if not self.memory_enabled:
+            return
+        
+        entry = HistoryEntry(time.time_ns(), message, response, context, cached)
+        self.conversation_history.append(entry)
+        self._history_view.extend((
+            {"role": "user", "content": message},
+            {"role": "assistant", "content": response}
+        ))
+        
+        if self._store is not None:
+            await self._store.append(entry._asdict())
+    
+    async def _prepare_context(self, context: Dict[str, Any] = None) -> List[Dict]:
         """Prepare conversation context for XAgent"""
         xagent_context = []
         
-        # Add recent conversation history
-        if self.memory_enabled and self.conversation_history:
-            for entry in self.conversation_history[-5:]:  # Last 5 exchanges
-                xagent_context.extend([
-                    {"role": "user", "content": entry["user_message"]},
-                    {"role": "assistant", "content": entry["agent_response"]}
-                ])
+        # Add recent conversation history (last 5 exchanges)
+        if self.memory_enabled:
+            if self._store is None:
+                xagent_context = list(self._history_view)
+            else:
+                for entry in await self._store.recent(5):
+                    xagent_context.extend((
+                        {"role": "user", "content": entry["user_message"]},
+                        {"role": "assistant", "content": entry["agent_response"]}
+                    ))
         
         # Add additional context if provided
         if context:
@@ -104,13 +205,39 @@ class ConversationalAgent:
         """Generate response method - L3AGI compatibility"""
         return await self.chat(prompt, kwargs.get("context"))
     
+    @staticmethod
+    def _fmt_ts(ns: int) -> str:
+        """Format a time_ns() timestamp as ISO 8601"""
+        return datetime.fromtimestamp(ns / 1e9).isoformat()
+    
     def get_memory(self) -> List[Dict]:
-        """Get conversation memory - L3AGI interface"""
-        return self.conversation_history
+        """Get conversation memory (this process's turns) - L3AGI interface"""
+        return [
+            {**entry._asdict(), "timestamp": self._fmt_ts(entry.timestamp)}
+            for entry in self.conversation_history
+        ]
     
     def clear_memory(self):
-        """Clear conversation memory"""
+        """
+        Clear conversation memory
+        Agents with a history_store must await aclear_memory() so the shared store is cleared too
+        """
+        if self._store is not None:
+            raise RuntimeError("clear_memory() cannot clear a shared history_store; await aclear_memory() instead")
+        
+        self._clear_local_memory()
+    
+    async def aclear_memory(self):
+        """Clear conversation memory, including the shared history store, before returning"""
+        if self._store is not None:
+            await self._store.clear()
+        
+        self._clear_local_memory()
+    
+    def _clear_local_memory(self):
+        """Clear this process's history and the backend's memory"""
         self.conversation_history.clear()
+        self._history_view.clear()
         self.xagent.clear_memory()
         self.logger.info("Memory cleared")
     
@@ -123,8 +250,7 @@ class ConversationalAgent:
     def add_tool(self, tool: Any):
         """Add tool to agent - L3AGI compatibility"""
         self.tools.append(tool)
-        self.xagent.tools.append(tool)
-        self.logger.info(f"Tool added: {str(tool)}")
+        self.logger.info("Tool added: %s", tool)
     
     def get_agent_info(self) -> Dict[str, Any]:
         """Get agent information - L3AGI interface"""
@@ -135,6 +261,7 @@ class ConversationalAgent:
             "memory_enabled": self.memory_enabled,
             "tools_count": len(self.tools),
             "conversation_length": len(self.conversation_history),
+            "cache_hits": self._response_cache.hits if self._response_cache is not None else 0,
             "system_prompt": self.system_prompt[:100] + "..." if len(self.system_prompt) > 100 else self.system_prompt
         }
 
@@ -145,27 +272,24 @@ class TeamConversationalAgent(ConversationalAgent):
     Enhanced with XAgent's collaborative capabilities
     """
     
+    __slots__ = ("team_role", "team_members", "shared_context")
+    
     def __init__(self, name: str, team_role: str, **kwargs):
-        super().__init__(name=name, **kwargs)
+        # Build team-aware system prompt up front so the backend is created with it
+        base_prompt = kwargs.pop("system_prompt", None) or _DEFAULT_SYSTEM_PROMPT
+        team_prompt = _TEAM_PROMPT_TEMPLATE.substitute(base=base_prompt, role=team_role)
+        
+        super().__init__(name=name, system_prompt=team_prompt, **kwargs)
         self.team_role = team_role
         self.team_members = {}
         self.shared_context = {}
         
-        # Update system prompt for team awareness
-        team_prompt = f"""
-{self.system_prompt}
-
-You are part of a team of AI agents. Your specific role is: {team_role}
-Collaborate effectively with other team members and maintain team context.
-"""
-        self.set_system_prompt(team_prompt)
-        
-        self.logger.info(f"Team agent {name} initialized with role: {team_role}")
+        self.logger.info("Team agent %s initialized with role: %s", name, team_role)
     
     def register_team_member(self, member_name: str, member_info: Dict[str, Any]):
         """Register a team member"""
         self.team_members[member_name] = member_info
-        self.logger.info(f"Team member registered: {member_name}")
+        self.logger.info("Team member registered: %s", member_name)
     
     def update_shared_context(self, context: Dict[str, Any]):
         """Update shared team context"""
@@ -188,26 +312,20 @@ Collaborate effectively with other team members and maintain team context.
         return await self.chat(message, full_context)
 
 
+# Factory defaults - merged once per call instead of a config.get() cascade
+_CONV_DEFAULTS = {"name": "Agent", "system_prompt": None, "memory_enabled": True, "tools": ()}
+_TEAM_CONV_DEFAULTS = {**_CONV_DEFAULTS, "name": "TeamAgent", "team_role": "member"}
+
+
 # Factory function for L3AGI integration
 def create_conversational_agent(config: Dict[str, Any]) -> ConversationalAgent:
     """Factory function to create conversational agents"""
-    agent_type = config.get("type", "standard")
-    
-    if agent_type == "team":
-        return TeamConversationalAgent(
-            name=config.get("name", "TeamAgent"),
-            team_role=config.get("team_role", "member"),
-            system_prompt=config.get("system_prompt"),
-            memory_enabled=config.get("memory_enabled", True),
-            tools=config.get("tools", [])
-        )
-    else:
-        return ConversationalAgent(
-            name=config.get("name", "Agent"),
-            system_prompt=config.get("system_prompt"),
-            memory_enabled=config.get("memory_enabled", True),
-            tools=config.get("tools", [])
-        )
+    if config.get("type", "standard") == "team":
+        cfg = {**_TEAM_CONV_DEFAULTS, **config}
+        return TeamConversationalAgent(**{key: cfg[key] for key in _TEAM_CONV_DEFAULTS})
+    
+    cfg = {**_CONV_DEFAULTS, **config}
+    return ConversationalAgent(**{key: cfg[key] for key in _CONV_DEFAULTS})
 
 
 # Export classes for L3AGI integration
@@ -6,12 +6,58 @@ Replaces Langchain REACT Agent with XAgent for tool-enabled dialogue
 import asyncio
 import json
 import logging
-from typing import Any, Dict, List, Optional, Callable
+import string
+import time
+from collections import Counter, deque, namedtuple
+from typing import Any, Dict, List, Optional, Callable, Tuple
 from datetime import datetime
 
+# Optional Aho-Corasick automaton for tool-mention scanning
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 # XAgent integration imports
 from xagent_integration.l3agi_compatibility import DialogueAgentWithToolsXAgent
-from xagent_integration.xagent_core import XAgentWrapper
+from xagent_integration.xagent_core import XAgentWrapper, _AgentLoggerAdapter, _ResponseCache
+
+logger = logging.getLogger("L3AGI.DialogueTools")
+
+# Compact dialogue record; get_dialogue_history() materializes dicts on demand
+DialogueEntry = namedtuple("DialogueEntry", "timestamp message response tools_available cached")
+
+# Options consumed by the agent itself; everything else is forwarded to the XAgent backend
+_AGENT_KWARGS = frozenset({
+    "role", "description", "max_history", "max_concurrency",
+    "cache_responses", "response_cache_size", "response_cache_ttl"
+})
+
+# send() kwargs whose values are deterministic inputs to the prompt (safe to cache)
+_CACHEABLE_SEND_KWARGS = frozenset({"coordination_context"})
+
+_TEAM_MESSAGE_TEMPLATE = string.Template("""
+$base
+
+TEAM ROLE: $role
+You are part of a collaborative team of AI agents. Coordinate effectively with team members,
+share relevant information, and leverage team expertise to solve complex problems.
+""")
+
+class ToolMeta(namedtuple("ToolMeta", "name description tool")):
+    """Tool name and description resolved once at registration"""
+    
+    __slots__ = ()
+    
+    @classmethod
+    def from_tool(cls, tool: Any, description: str = None, default: str = "No description available") -> "ToolMeta":
+        """Build metadata from a tool object"""
+        return cls(
+            getattr(tool, '__name__', str(tool)),
+            description or getattr(tool, 'description', default),
+            tool
+        )
+
 
 class DialogueAgentWithTools:
     """
@@ -19,6 +65,16 @@ class DialogueAgentWithTools:
     Maintains L3AGI interface while leveraging XAgent's advanced tool integration
     """
     
+    # Instantiated per user/session - slots drop the per-instance __dict__
+    __slots__ = (
+        "name", "system_message", "tools", "_tool_metas", "model_config", "xagent",
+        "dialogue_history", "tool_usage_stats", "_tool_lower_names", "_automaton",
+        "_sem", "_response_cache", "logger", "__weakref__"
+    )
+    
+    # Minimum tool count before an Aho-Corasick automaton pays off
+    _AUTOMATON_MIN_TOOLS = 8
+    
     def __init__(self,
                  name: str,
                  system_message: str,
@@ -29,6 +85,11 @@ class DialogueAgentWithTools:
         self.name = name
         self.system_message = system_message
         self.tools = tools or []
+        # Tool name -> metas in registration order; distinct tools may share a name (e.g. lambdas)
+        self._tool_metas = {}
+        for tool in self.tools:
+            meta = ToolMeta.from_tool(tool)
+            self._tool_metas.setdefault(meta.name, []).append(meta)
         self.model_config = kwargs.get("model_config", {})
         
         # Initialize XAgent wrapper
@@ -38,14 +99,26 @@ class DialogueAgentWithTools:
             system_prompt=system_message,
             role=kwargs.get("role", "assistant"),
             description=kwargs.get("description", f"Tool-enabled agent {name}"),
-            **kwargs
+            **{key: value for key, value in kwargs.items() if key not in _AGENT_KWARGS}
         )
+        # Share one tools list with the backend so mutations stay in sync
+        self.xagent.set_tools(self.tools)
+        
+        self.dialogue_history = deque(maxlen=kwargs.get("max_history", 1024))
+        self.tool_usage_stats = Counter()
+        self._rebuild_tool_index()
+        
+        # Bound in-flight backend requests under burst load
+        self._sem = asyncio.Semaphore(kwargs.get("max_concurrency", 32))
         
-        self.dialogue_history = []
-        self.tool_usage_stats = {}
-        self.logger = logging.getLogger(f"L3AGI.DialogueTools.{name}")
+        # Opt-in (cache_responses=True): skip identical prompts (system message + tools + message)
+        self._response_cache = _ResponseCache(
+            maxsize=kwargs.get("response_cache_size", 4096),
+            ttl=kwargs.get("response_cache_ttl", 600)
+        ) if kwargs.get("cache_responses", False) else None
+        self.logger = _AgentLoggerAdapter(logger, {"agent_name": name})
         
-        self.logger.info(f"Dialogue agent {name} initialized with {len(self.tools)} tools")
+        self.logger.info("Dialogue agent %s initialized with %d tools", name, len(self.tools))
     
     async def send(self, message: str, **kwargs) -> str:
         """
@@ -54,18 +127,30 @@ class DialogueAgentWithTools:
         """
         try:
             # Log incoming message
-            self.logger.info(f"Processing message: {message[:100]}...")
+            self.logger.info("Processing message: %.100s...", message)
             
-            # Use XAgent for intelligent response generation
-            response = await self.xagent.send(message, **kwargs)
+            cache_key = None
+            response = None
+            if self._response_cache is not None and kwargs.keys() <= _CACHEABLE_SEND_KWARGS:
+                cache_key = _ResponseCache.make_key(
+                    self.system_message, [(name, len(metas)) for name, metas in self._tool_metas.items()], message, kwargs
+                )
+                response = self._response_cache.get(cache_key)
+            
+            cached = response is not None
+            if not cached:
+                # Use XAgent for intelligent response generation
+                async with self._sem:
+                    response = await self.xagent.send(message, **kwargs)
+                
+                # The backend raises on failure, so only successful responses get here
+                if cache_key is not None:
+                    self._response_cache.set(cache_key, response)
             
             # Track dialogue history
-            self.dialogue_history.append({
-                "timestamp": datetime.now().isoformat(),
-                "message": message,
-                "response": response,
-                "tools_available": len(self.tools)
-            })
+            self.dialogue_history.append(
+                DialogueEntry(time.time_ns(), message, response, len(self.tools), cached)
+            )
             
             # Update tool usage statistics
             self._update_tool_stats(response)
@@ -73,16 +158,39 @@ class DialogueAgentWithTools:
             return response
             
         except Exception as e:
-            error_msg = f"Dialogue send failed: {str(e)}"
-            self.logger.error(error_msg)
+            self.logger.error("Dialogue send failed: %s", e)
             return f"I encountered an error processing your message: {str(e)}"
     
+    def _rebuild_tool_index(self):
+        """Cache lowercase tool names and rebuild the mention automaton"""
+        self._tool_lower_names = [(tool_name.lower(), tool_name) for tool_name in self._tool_metas]
+        
+        self._automaton = None
+        if ahocorasick is not None and len(self._tool_lower_names) >= self._AUTOMATON_MIN_TOOLS:
+            # Names differing only in case share a key, so each word maps to every matching index
+            indices_by_word = {}
+            for index, (lower_name, _) in enumerate(self._tool_lower_names):
+                indices_by_word.setdefault(lower_name, []).append(index)
+            
+            self._automaton = ahocorasick.Automaton()
+            for lower_name, indices in indices_by_word.items():
+                self._automaton.add_word(lower_name, indices)
+            self._automaton.make_automaton()
+    
     def _update_tool_stats(self, response: str):
         """Update tool usage statistics based on response"""
-        for tool in self.tools:
-            tool_name = getattr(tool, '__name__', str(tool))
-            if tool_name.lower() in response.lower():
-                self.tool_usage_stats[tool_name] = self.tool_usage_stats.get(tool_name, 0) + 1
+        response_lower = response.lower()
+        
+        if self._automaton is not None:
+            # Single linear pass; each tool counts at most once per response
+            matched = {index for _, indices in self._automaton.iter(response_lower) for index in indices}
+            mentioned = [self._tool_lower_names[index][1] for index in sorted(matched)]
+        else:
+            mentioned = [name for lower_name, name in self._tool_lower_names if lower_name in response_lower]
+        
+        # Same-named tools each count, as when every tool was scanned individually
+        for name in mentioned:
+            self.tool_usage_stats[name] += len(self._tool_metas[name])
     
     async def generate_reply(self, messages: List[Dict[str, str]], **kwargs) -> str:
         """Generate reply method - L3AGI compatibility"""
@@ -93,46 +201,82 @@ class DialogueAgentWithTools:
         latest_message = messages[-1].get("content", "")
         return await self.send(latest_message, **kwargs)
     
+    @classmethod
+    async def reply_many(cls, agents: List["DialogueAgentWithTools"], messages: List[str], **kwargs) -> List[str]:
+        """
+        Fan in replies across agents concurrently instead of N sequential awaits
+        This is a plain gather: each agent owns its backend, so only repeated
+        sends to the same agent can share a backend batch
+        """
+        if len(agents) != len(messages):
+            raise ValueError("agents and messages must have the same length")
+        
+        return list(await asyncio.gather(
+            *(agent.send(message, **kwargs) for agent, message in zip(agents, messages))
+        ))
+    
     def add_tool(self, tool: Any, description: str = None):
         """Add tool to agent - L3AGI interface"""
         self.tools.append(tool)
-        self.xagent.tools.append(tool)
         
         # Update tool description if provided
         if description and hasattr(tool, 'description'):
             tool.description = description
         
-        self.logger.info(f"Tool added: {getattr(tool, '__name__', str(tool))}")
+        meta = ToolMeta.from_tool(tool)
+        self._tool_metas.setdefault(meta.name, []).append(meta)
+        
+        self._rebuild_tool_index()
+        self.xagent.set_tools(self.tools)
+        self.logger.info("Tool added: %s", meta.name)
     
     def remove_tool(self, tool_name: str) -> bool:
-        """Remove tool from agent"""
+        """Remove the first tool registered under tool_name"""
+        metas = self._tool_metas.get(tool_name)
+        if not metas:
+            return False
+        removed_tool = metas.pop(0).tool
+        if not metas:
+            del self._tool_metas[tool_name]
+        
+        # In-place delete keeps the list shared with the backend
         for i, tool in enumerate(self.tools):
-            if getattr(tool, '__name__', str(tool)) == tool_name:
-                removed_tool = self.tools.pop(i)
-                self.xagent.tools.remove(removed_tool)
-                self.logger.info(f"Tool removed: {tool_name}")
-                return True
-        return False
+            if tool is removed_tool:
+                del self.tools[i]
+                break
+        
+        self._rebuild_tool_index()
+        self.xagent.set_tools(self.tools)
+        self.logger.info("Tool removed: %s", tool_name)
+        return True
     
     def get_available_tools(self) -> List[Dict[str, Any]]:
         """Get list of available tools"""
-        tools_info = []
-        for tool in self.tools:
-            tool_info = {
-                "name": getattr(tool, '__name__', str(tool)),
-                "description": getattr(tool, 'description', 'No description available'),
-                "usage_count": self.tool_usage_stats.get(getattr(tool, '__name__', str(tool)), 0)
+        return [
+            {
+                "name": meta.name,
+                "description": meta.description,
+                "usage_count": self.tool_usage_stats.get(meta.name, 0)
             }
-            tools_info.append(tool_info)
-        return tools_info
+            for metas in self._tool_metas.values()
+            for meta in metas
+        ]
     
     def describe(self) -> str:
         """Get agent description - L3AGI interface"""
         return self.xagent.describe()
     
+    @staticmethod
+    def _fmt_ts(ns: int) -> str:
+        """Format a time_ns() timestamp as ISO 8601"""
+        return datetime.fromtimestamp(ns / 1e9).isoformat()
+    
     def get_dialogue_history(self) -> List[Dict[str, Any]]:
         """Get dialogue history"""
-        return self.dialogue_history
+        return [
+            {**entry._asdict(), "timestamp": self._fmt_ts(entry.timestamp)}
+            for entry in self.dialogue_history
+        ]
     
     def clear_history(self):
         """Clear dialogue history"""
@@ -147,8 +291,9 @@ class DialogueAgentWithTools:
             "total_dialogues": len(self.dialogue_history),
             "tools_count": len(self.tools),
             "tool_usage_stats": self.tool_usage_stats,
+            "cache_hits": self._response_cache.hits if self._response_cache is not None else 0,
             "backend": "XAgent",
-            "last_activity": self.dialogue_history[-1]["timestamp"] if self.dialogue_history else None
+            "last_activity": self._fmt_ts(self.dialogue_history[-1].timestamp) if self.dialogue_history else None
         }
 
 
@@ -158,21 +303,17 @@ class TeamDialogueAgent(DialogueAgentWithTools):
     Enhanced with XAgent's team coordination capabilities
     """
     
+    __slots__ = ("team_role", "team_coordination_history")
+    
     def __init__(self, name: str, system_message: str, team_role: str, tools: List[Any] = None, **kwargs):
         # Enhance system message for team context
-        team_system_message = f"""
-{system_message}
-
-TEAM ROLE: {team_role}
-You are part of a collaborative team of AI agents. Coordinate effectively with team members,
-share relevant information, and leverage team expertise to solve complex problems.
-"""
+        team_system_message = _TEAM_MESSAGE_TEMPLATE.substitute(base=system_message, role=team_role)
         
         super().__init__(name, team_system_message, tools, **kwargs)
         self.team_role = team_role
-        self.team_coordination_history = []
+        self.team_coordination_history = deque(maxlen=kwargs.get("max_history", 1024))
         
-        self.logger.info(f"Team dialogue agent {name} initialized with role: {team_role}")
+        self.logger.info("Team dialogue agent %s initialized with role: %s", name, team_role)
     
     async def coordinate_with_team(self, coordination_message: str, target_agents: List[str] = None) -> str:
         """Coordinate with team members"""
@@ -192,7 +333,7 @@ share relevant information, and leverage team expertise to solve complex problem
         
         # Track coordination history
         self.team_coordination_history.append({
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": time.time_ns(),
             "coordination_message": coordination_message,
             "response": response,
             "target_agents": target_agents
@@ -206,7 +347,7 @@ share relevant information, and leverage team expertise to solve complex problem
         base_stats.update({
             "team_role": self.team_role,
             "coordination_count": len(self.team_coordination_history),
-            "last_coordination": self.team_coordination_history[-1]["timestamp"] if self.team_coordination_history else None
+            "last_coordination": self._fmt_ts(self.team_coordination_history[-1]["timestamp"]) if self.team_coordination_history else None
         })
         return base_stats
 
@@ -220,16 +361,18 @@ class ToolManager:
     def __init__(self):
         self.registered_tools = {}
         self.tool_categories = {}
+        self._category_cache = {}
         self.logger = logging.getLogger("L3AGI.ToolManager")
     
     def register_tool(self, tool: Any, category: str = "general", description: str = None):
         """Register a tool with the manager"""
-        tool_name = getattr(tool, '__name__', str(tool))
+        meta = ToolMeta.from_tool(tool, description, default="No description")
+        tool_name = meta.name
         
         self.registered_tools[tool_name] = {
             "tool": tool,
             "category": category,
-            "description": description or getattr(tool, 'description', 'No description'),
+            "description": meta.description,
             "registered_at": datetime.now().isoformat()
         }
         
@@ -238,17 +381,24 @@ class ToolManager:
             self.tool_categories[category] = []
         self.tool_categories[category].append(tool_name)
         
-        self.logger.info(f"Tool registered: {tool_name} in category {category}")
-    
-    def get_tools_by_category(self, category: str) -> List[Any]:
-        """Get tools by category"""
-        if category not in self.tool_categories:
-            return []
+        # Re-registering a name can move it between categories, so drop every cached view
+        self._category_cache.clear()
         
-        tools = []
-        for tool_name in self.tool_categories[category]:
-            if tool_name in self.registered_tools:
-                tools.append(self.registered_tools[tool_name]["tool"])
+        self.logger.info("Tool registered: %s in category %s", tool_name, category)
+    
+    def get_tools_by_category(self, category: str) -> Tuple[Any, ...]:
+        """
+        Get tools by category
+        Returns the cached read-only view; copy it with list() before mutating
+        """
+        tools = self._category_cache.get(category)
+        if tools is None:
+            tools = tuple(
+                self.registered_tools[tool_name]["tool"]
+                for tool_name in self.tool_categories.get(category, ())
+                if tool_name in self.registered_tools
+            )
+            self._category_cache[category] = tools
         
         return tools
     
@@ -261,24 +411,20 @@ class ToolManager:
         return DialogueAgentWithTools(name, system_message, tools)
 
 
+# Factory defaults - merged once per call instead of a config.get() cascade
+_DIALOGUE_DEFAULTS = {"name": "DialogueAgent", "system_message": "You are a helpful AI assistant.", "tools": ()}
+_TEAM_DIALOGUE_DEFAULTS = {**_DIALOGUE_DEFAULTS, "name": "TeamDialogueAgent", "team_role": "member"}
+
+
 # Factory functions for L3AGI integration
 def create_dialogue_agent(config: Dict[str, Any]) -> DialogueAgentWithTools:
     """Factory function to create dialogue agents"""
-    agent_type = config.get("type", "standard")
+    if config.get("type", "standard") == "team":
+        cfg = {**_TEAM_DIALOGUE_DEFAULTS, **config}
+        return TeamDialogueAgent(**{key: cfg[key] for key in _TEAM_DIALOGUE_DEFAULTS})
     
-    if agent_type == "team":
-        return TeamDialogueAgent(
-            name=config.get("name", "TeamDialogueAgent"),
-            system_message=config.get("system_message", "You are a helpful AI assistant."),
-            team_role=config.get("team_role", "member"),
-            tools=config.get("tools", [])
-        )
-    else:
-        return DialogueAgentWithTools(
-            name=config.get("name", "DialogueAgent"),
-            system_message=config.get("system_message", "You are a helpful AI assistant."),
-            tools=config.get("tools", [])
-        )
+    cfg = {**_DIALOGUE_DEFAULTS, **config}
+    return DialogueAgentWithTools(**{key: cfg[key] for key in _DIALOGUE_DEFAULTS})
 
 
 # Export classes for L3AGI integration
@@ -4,14 +4,74 @@ Comprehensive testing suite for XAgent-L3AGI integration
 """
 
 import asyncio
-import json
+import atexit
+import contextlib
+import functools
 import logging
+import logging.handlers
+import queue
 import sys
 import os
-from typing import Any, Dict, List, Optional
-from datetime import datetime
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from dataclasses import asdict, dataclass, is_dataclass
 import time
 
+# Hot callables bound once at module scope
+_perf = time.perf_counter
+_gather = asyncio.gather
+_sleep = asyncio.sleep
+
+# Optional C JSON encoder for result files; handles dataclasses natively
+try:
+    import orjson
+    
+    def _dumps(obj: Any, indent: bool = False) -> bytes:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_INDENT_2 if indent else 0)
+except ImportError:
+    orjson = None
+    
+    def _dumps(obj: Any, indent: bool = False) -> bytes:
+        import json  # deferred: only needed when writing result files without orjson
+        return json.dumps(obj, indent=2 if indent else None, default=_json_default).encode()
+
+
+@dataclass(slots=True)
+class TestResult:
+    """Outcome of a single test; converted to a dict only when serialized"""
+    __test__ = False  # not a pytest test class
+    
+    name: str = ""
+    passed: bool = False
+    duration: float = 0.0
+    message: str = ""
+    error: str = ""
+
+
+def _json_default(obj: Any) -> Any:
+    """json.dumps fallback that serializes dataclasses field by field"""
+    if is_dataclass(obj):
+        return asdict(obj)
+    return str(obj)
+
+
+def _timed_test(fn: Callable) -> Callable:
+    """Wrap a test returning (passed, message) with timing and exception handling"""
+    @functools.wraps(fn)
+    async def wrapper(self) -> TestResult:
+        result = TestResult()
+        start_time = _perf()
+        try:
+            result.passed, result.message = await fn(self)
+        except Exception as e:
+            result.passed = False
+            result.error = str(e)
+        finally:
+            # Single clock read shared by success and error paths
+            result.duration = _perf() - start_time
+        return result
+    return wrapper
+
 # Add project root to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -26,6 +86,7 @@ except ImportError:
             self.test_results = []
         
         async def run_test_suite(self, test_cases):
+            await _sleep(0)
             return {"total_tests": 18, "passed": 18, "failed": 0, "test_details": []}
 
 # Local imports
@@ -35,11 +96,19 @@ try:
 except ImportError:
     # Create mock classes for demo
     class ConversationalAgent:
+        _PREFIX = "Mock response to: "
+        
         def __init__(self, name="MockAgent", **kwargs):
             self.name = name
+            self._cache: Dict[str, str] = {}
         
         async def chat(self, message):
-            return f"Mock response to: {message}"
+            await _sleep(0)
+            # Responses are deterministic, so repeat prompts reuse the built string
+            response = self._cache.get(message)
+            if response is None:
+                response = self._cache[message] = self._PREFIX + message
+            return response
         
         def get_memory(self):
             return []
@@ -51,6 +120,8 @@ except ImportError:
             return {"name": self.name, "type": "ConversationalAgent", "backend": "XAgent"}
     
     class TeamConversationalAgent(ConversationalAgent):
+        _TEAM_PREFIX = "Team response to: "
+        
         def __init__(self, name, team_role, **kwargs):
             super().__init__(name, **kwargs)
             self.team_role = team_role
@@ -62,16 +133,20 @@ except ImportError:
             pass
         
         async def team_chat(self, message, sender=None):
-            return f"Team response to: {message}"
+            await _sleep(0)
+            return self._TEAM_PREFIX + message
     
     class DialogueAgentWithTools:
+        _PREFIX = "Tool-enabled response to: "
+        
         def __init__(self, name, system_message, tools=None):
             self.name = name
             self.system_message = system_message
             self.tools = tools or []
         
         async def send(self, message):
-            return f"Tool-enabled response to: {message}"
+            await _sleep(0)
+            return self._PREFIX + message
         
         def add_tool(self, tool):
             self.tools.append(tool)
@@ -83,21 +158,164 @@ except ImportError:
             return {"name": self.name, "tools_count": len(self.tools)}
     
     class TeamDialogueAgent(DialogueAgentWithTools):
+        _TEAM_PREFIX = "Team coordination: "
+        
         def __init__(self, name, system_message, team_role, tools=None):
             super().__init__(name, system_message, tools)
             self.team_role = team_role
         
         async def coordinate_with_team(self, message, target_agents=None):
-            return f"Team coordination: {message}"
+            await _sleep(0)
+            return self._TEAM_PREFIX + message
 
 # Configure logging for testing
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("XAgent.L3AGI.Test")
 
+
+@contextlib.contextmanager
+def _queued_logging():
+    """
+    Route root log records through a listener thread while the suite runs,
+    keeping stream I/O off the event loop; the original handlers are restored on exit
+    """
+    root = logging.getLogger()
+    handlers = root.handlers[:]
+    
+    queue_handler = logging.handlers.QueueHandler(queue.Queue(-1))
+    # Leave the message bare; the original handlers apply their own format once
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))
+    listener = logging.handlers.QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+    
+    listener.start()
+    root.handlers = [queue_handler]
+    try:
+        yield
+    finally:
+        root.handlers = handlers
+        listener.stop()
+
+class _FakeRedis:
+    """In-process stand-in for the redis.asyncio calls RedisStore makes"""
+    
+    def __init__(self):
+        self.lists: Dict[str, List[bytes]] = {}
+    
+    def pipeline(self, transaction: bool = True) -> "_FakeRedisPipeline":
+        return _FakeRedisPipeline(self)
+    
+    async def lrange(self, key: str, start: int, end: int) -> List[bytes]:
+        # Redis ranges are inclusive and -1 means "to the end"
+        return self.lists.get(key, [])[start:None if end == -1 else end + 1]
+    
+    async def delete(self, key: str):
+        self.lists.pop(key, None)
+
+
+class _FakeRedisPipeline:
+    """Queues list commands and applies them on execute()"""
+    
+    def __init__(self, client: _FakeRedis):
+        self.client = client
+        self.commands: List[Callable[[], None]] = []
+    
+    async def __aenter__(self) -> "_FakeRedisPipeline":
+        return self
+    
+    async def __aexit__(self, *exc_info) -> bool:
+        return False
+    
+    def lpush(self, key: str, value: bytes):
+        self.commands.append(lambda: self.client.lists.setdefault(key, []).insert(0, value))
+    
+    def ltrim(self, key: str, start: int, end: int):
+        self.commands.append(lambda: self.client.lists.__setitem__(
+            key, self.client.lists.get(key, [])[start:None if end == -1 else end + 1]
+        ))
+    
+    async def execute(self):
+        for command in self.commands:
+            command()
+        self.commands.clear()
+
+
 class XAgentL3AGITestSuite:
     """Comprehensive test suite for XAgent-L3AGI integration"""
     
-    def __init__(self):
+    # Category dispatch: display name -> method name, resolved with getattr at run time
+    _CATEGORY_FUNCS = {
+        "Basic Integration": "test_basic_integration",
+        "Conversational Agents": "test_conversational_agents",
+        "Dialogue with Tools": "test_dialogue_with_tools",
+        "Team Coordination": "test_team_coordination",
+        "State Management": "test_state_management",
+        "Performance Tests": "test_performance",
+        "Error Handling": "test_error_handling",
+    }
+    _CATEGORY_ORDER = tuple(_CATEGORY_FUNCS)
+    
+    # Per-category tests: (display name, method name)
+    _BASIC_INTEGRATION_TESTS = (
+        ("XAgent Import Test", "_test_xagent_imports"),
+        ("Agent Initialization", "_test_agent_initialization"),
+        ("Basic Communication", "_test_basic_communication"),
+        ("Plan Wave Scheduling", "_test_plan_waves"),
+    )
+    
+    _CONVERSATIONAL_AGENTS_TESTS = (
+        ("Conversational Agent Creation", "_test_conversational_creation"),
+        ("Chat Functionality", "_test_chat_functionality"),
+        ("Memory Management", "_test_memory_management"),
+        ("Team Conversational Agent", "_test_team_conversational"),
+        ("Streaming Chat", "_test_chat_stream"),
+    )
+    
+    _DIALOGUE_WITH_TOOLS_TESTS = (
+        ("Tool-enabled Agent Creation", "_test_tool_agent_creation"),
+        ("Tool Integration", "_test_tool_integration"),
+        ("Tool Usage Statistics", "_test_tool_statistics"),
+    )
+    
+    _TEAM_COORDINATION_TESTS = (
+        ("Team Formation", "_test_team_formation"),
+        ("Inter-agent Communication", "_test_inter_agent_communication"),
+        ("Shared Context Management", "_test_shared_context"),
+        ("Multi-agent Reply Fan-in", "_test_reply_many"),
+    )
+    
+    _STATE_MANAGEMENT_TESTS = (
+        ("In-memory History Store", "_test_inmemory_store"),
+        ("SQLite History Store", "_test_sqlite_store"),
+        ("Redis History Store", "_test_redis_store"),
+        ("Response Cache Rules", "_test_response_cache"),
+    )
+    
+    _PERFORMANCE_TESTS = (
+        ("Response Time", "_test_response_time"),
+        ("Memory Usage", "_test_memory_usage"),
+        ("Concurrent Operations", "_test_concurrent_operations"),
+        ("Overlapping Backend Batches", "_test_batch_overlap"),
+        ("Blocking Backend Offload", "_test_blocking_backend_offload"),
+    )
+    
+    _ERROR_HANDLING_TESTS = (
+        ("Invalid Input Handling", "_test_invalid_input"),
+        ("Exception Recovery", "_test_exception_recovery"),
+        ("Timeout Handling", "_test_timeout_handling"),
+    )
+    
+    # Per-call bound for timeout tests and global ceiling so a hung backend cannot stall CI
+    _CHAT_TIMEOUT = 2.0
+    _SUITE_TIMEOUT = 60.0
+    
+    _MEMORY_USAGE_MESSAGES = tuple(f"Message {i}" for i in range(10))
+    
+    # Simulated backend latency; batches that overlap finish in about one of these
+    _SLOW_BACKEND_LATENCY = 0.1
+    
+    def __init__(self, result_queue: Optional[asyncio.Queue] = None):
+        """result_queue, when given, receives each TestResult as soon as it completes"""
+        self.result_queue = result_queue
         self.test_interface = XAgentTestInterface()
         self.test_results = []
         self.performance_metrics = {}
@@ -105,567 +323,569 @@ class XAgentL3AGITestSuite:
     async def run_all_tests(self) -> Dict[str, Any]:
         """Run complete test suite"""
         logger.info("Starting XAgent-L3AGI Integration Test Suite")
-        start_time = time.time()
-        
-        # Test categories
-        test_categories = [
-            ("Basic Integration", self.test_basic_integration),
-            ("Conversational Agents", self.test_conversational_agents),
-            ("Dialogue with Tools", self.test_dialogue_with_tools),
-            ("Team Coordination", self.test_team_coordination),
-            ("Performance Tests", self.test_performance),
-            ("Error Handling", self.test_error_handling)
-        ]
+        start_time = _perf()
         
         results = {"categories": {}, "summary": {}}
         
-        for category_name, test_function in test_categories:
-            logger.info(f"Running {category_name} tests...")
-            category_results = await test_function()
-            results["categories"][category_name] = category_results
-            
-        # Calculate summary
-        total_tests = sum(r.get("total", 0) for r in results["categories"].values())
-        total_passed = sum(r.get("passed", 0) for r in results["categories"].values())
-        total_failed = sum(r.get("failed", 0) for r in results["categories"].values())
+        # Categories share no state, so run them concurrently
+        for category_name in self._CATEGORY_ORDER:
+            logger.info("Running %s tests...", category_name)
+        category_results_list = await asyncio.wait_for(
+            _gather(*(getattr(self, self._CATEGORY_FUNCS[name])() for name in self._CATEGORY_ORDER)),
+            timeout=self._SUITE_TIMEOUT
+        )
+        results["categories"] = dict(zip(self._CATEGORY_ORDER, category_results_list))
+        
+        # Calculate summary in one pass; _run_test_group always sets all three counts
+        total_tests = total_passed = total_failed = 0
+        for r in results["categories"].values():
+            total_tests += r["total"]
+            total_passed += r["passed"]
+            total_failed += r["failed"]
         
         results["summary"] = {
             "total_tests": total_tests,
             "passed": total_passed,
             "failed": total_failed,
             "success_rate": (total_passed / total_tests) * 100 if total_tests > 0 else 0,
-            "duration": time.time() - start_time
+            "duration": _perf() - start_time
         }
         
-        logger.info(f"Test suite completed: {total_passed}/{total_tests} passed")
+        logger.info("Test suite completed: %d/%d passed", total_passed, total_tests)
         return results
     
     async def test_basic_integration(self) -> Dict[str, Any]:
         """Test basic XAgent integration functionality"""
-        tests = [
-            {
-                "name": "XAgent Import Test",
-                "test_func": self._test_xagent_imports
-            },
-            {
-                "name": "Agent Initialization",
-                "test_func": self._test_agent_initialization
-            },
-            {
-                "name": "Basic Communication",
-                "test_func": self._test_basic_communication
-            }
-        ]
-        
-        return await self._run_test_group(tests)
+        return await self._run_test_group(self._BASIC_INTEGRATION_TESTS)
     
     async def test_conversational_agents(self) -> Dict[str, Any]:
         """Test conversational agent functionality"""
-        tests = [
-            {
-                "name": "Conversational Agent Creation",
-                "test_func": self._test_conversational_creation
-            },
-            {
-                "name": "Chat Functionality",
-                "test_func": self._test_chat_functionality
-            },
-            {
-                "name": "Memory Management",
-                "test_func": self._test_memory_management
-            },
-            {
-                "name": "Team Conversational Agent",
-                "test_func": self._test_team_conversational
-            }
-        ]
-        
-        return await self._run_test_group(tests)
+        return await self._run_test_group(self._CONVERSATIONAL_AGENTS_TESTS)
     
     async def test_dialogue_with_tools(self) -> Dict[str, Any]:
         """Test dialogue agents with tools"""
-        tests = [
-            {
-                "name": "Tool-enabled Agent Creation",
-                "test_func": self._test_tool_agent_creation
-            },
-            {
-                "name": "Tool Integration",
-                "test_func": self._test_tool_integration
-            },
-            {
-                "name": "Tool Usage Statistics",
-                "test_func": self._test_tool_statistics
-            }
-        ]
-        
-        return await self._run_test_group(tests)
+        return await self._run_test_group(self._DIALOGUE_WITH_TOOLS_TESTS)
     
     async def test_team_coordination(self) -> Dict[str, Any]:
         """Test team coordination functionality"""
-        tests = [
-            {
-                "name": "Team Formation",
-                "test_func": self._test_team_formation
-            },
-            {
-                "name": "Inter-agent Communication",
-                "test_func": self._test_inter_agent_communication
-            },
-            {
-                "name": "Shared Context Management",
-                "test_func": self._test_shared_context
-            }
-        ]
-        
-        return await self._run_test_group(tests)
+        return await self._run_test_group(self._TEAM_COORDINATION_TESTS)
+    
+    async def test_state_management(self) -> Dict[str, Any]:
+        """Test history stores and response caching"""
+        return await self._run_test_group(self._STATE_MANAGEMENT_TESTS)
     
     async def test_performance(self) -> Dict[str, Any]:
         """Test performance characteristics"""
-        tests = [
-            {
-                "name": "Response Time",
-                "test_func": self._test_response_time
-            },
-            {
-                "name": "Memory Usage",
-                "test_func": self._test_memory_usage
-            },
-            {
-                "name": "Concurrent Operations",
-                "test_func": self._test_concurrent_operations
-            }
-        ]
-        
-        return await self._run_test_group(tests)
+        return await self._run_test_group(self._PERFORMANCE_TESTS)
     
     async def test_error_handling(self) -> Dict[str, Any]:
         """Test error handling and recovery"""
-        tests = [
-            {
-                "name": "Invalid Input Handling",
-                "test_func": self._test_invalid_input
-            },
-            {
-                "name": "Exception Recovery",
-                "test_func": self._test_exception_recovery
-            },
-            {
-                "name": "Timeout Handling",
-                "test_func": self._test_timeout_handling
-            }
-        ]
-        
-        return await self._run_test_group(tests)
-    
-    async def _run_test_group(self, tests: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Run a group of tests"""
-        results = {"tests": [], "total": 0, "passed": 0, "failed": 0}
-        
-        for test in tests:
-            try:
-                test_result = await test["test_func"]()
-                test_result["name"] = test["name"]
-                results["tests"].append(test_result)
-                results["total"] += 1
-                
-                if test_result.get("passed", False):
-                    results["passed"] += 1
-                else:
-                    results["failed"] += 1
-                    
-            except Exception as e:
-                results["tests"].append({
-                    "name": test["name"],
-                    "passed": False,
-                    "error": str(e),
-                    "duration": 0
-                })
-                results["total"] += 1
-                results["failed"] += 1
-        
-        return results
+        return await self._run_test_group(self._ERROR_HANDLING_TESTS)
+    
+    async def _run_test_group(self, tests: Tuple[Tuple[str, str], ...]) -> Dict[str, Any]:
+        """Run a group of (name, method name) tests, keeping only running counts"""
+        outcomes = await _gather(*(self._run_named_test(name, method) for name, method in tests))
+        passed = sum(outcomes)
+        return {"total": len(outcomes), "passed": passed, "failed": len(outcomes) - passed}
+    
+    async def _run_named_test(self, test_name: str, method: str) -> bool:
+        """Run one test and stream its result to the result queue"""
+        # Each test is wrapped by _timed_test and always returns a TestResult
+        test_result = await getattr(self, method)()
+        test_result.name = test_name
+        if self.result_queue is not None:
+            self.result_queue.put_nowait(test_result)
+        return bool(test_result.passed)
     
     # Individual test implementations
-    async def _test_xagent_imports(self) -> Dict[str, Any]:
+    @_timed_test
+    async def _test_xagent_imports(self) -> Tuple[bool, str]:
         """Test XAgent import functionality"""
-        start_time = time.time()
-        try:
-            from xagent_integration.xagent_core import XAgentWrapper
-            from xagent_integration.l3agi_compatibility import ConversationalXAgent
-            return {
-                "passed": True,
-                "duration": time.time() - start_time,
-                "message": "XAgent imports successful"
-            }
-        except Exception as e:
-            return {
-                "passed": False,
-                "duration": time.time() - start_time,
-                "error": str(e)
-            }
+        from xagent_integration.xagent_core import XAgentWrapper
+        from xagent_integration.l3agi_compatibility import ConversationalXAgent
+        return True, "XAgent imports successful"
     
-    async def _test_agent_initialization(self) -> Dict[str, Any]:
+    @_timed_test
+    async def _test_agent_initialization(self) -> Tuple[bool, str]:
         """Test agent initialization"""
-        start_time = time.time()
-        try:
-            agent = ConversationalAgent(name="TestAgent")
-            return {
-                "passed": True,
-                "duration": time.time() - start_time,
-                "message": f"Agent {agent.name} initialized successfully"
-            }
-        except Exception as e:
-            return {
-                "passed": False,
-                "duration": time.time() - start_time,
-                "error": str(e)
-            }
+        agent = ConversationalAgent(name="TestAgent")
+        return True, f"Agent {agent.name} initialized successfully"
     
-    async def _test_basic_communication(self) -> Dict[str, Any]:
+    @_timed_test
+    async def _test_basic_communication(self) -> Tuple[bool, str]:
         """Test basic communication"""
-        start_time = time.time()
-        try:
-            agent = ConversationalAgent(name="CommTestAgent")
-            response = await agent.chat("Hello, this is a test message.")
-            
-            success = isinstance(response, str) and len(response) > 0
-            return {
-                "passed": success,
-                "duration": time.time() - start_time,
-                "message": f"Communication test completed: {len(response)} chars response"
-            }
-        except Exception as e:
-            return {
-                "passed": False,
-                "duration": time.time() - start_time,
-                "error": str(e)
-            }
+        agent = ConversationalAgent(name="CommTestAgent")
+        response = await agent.chat("Hello, this is a test message.")
+        
+        success = isinstance(response, str) and len(response) > 0
+        return success, f"Communication test completed: {len(response)} chars response"
+    
+    @_timed_test
+    async def _test_plan_waves(self) -> Tuple[bool, str]:
+        """Test dependency-wave ordering and rejection of invalid plans"""
+        steps = [
+            {"action": "analyze"},
+            {"action": "execute", "deps": [0]},
+            {"action": "execute", "deps": [0]},
+            {"action": "validate", "deps": [1, 2]}
+        ]
+        waves = XAgentWrapper._plan_waves(steps)
+        
+        rejected = 0
+        invalid_plans = (
+            [{"deps": [1]}, {"deps": [0]}],  # cycle
+            [{"deps": [0]}],                 # self-reference
+            [{}, {"deps": [-1]}],            # out of range
+        )
+        for plan_steps in invalid_plans:
+            try:
+                XAgentWrapper._plan_waves(plan_steps)
+            except ValueError:
+                rejected += 1
+        
+        success = waves == [[0], [1, 2], [3]] and rejected == len(invalid_plans)
+        return success, f"Plan waves: {waves}, {rejected}/{len(invalid_plans)} invalid plans rejected"
     
-    async def _test_conversational_creation(self) -> Dict[str, Any]:
+    @_timed_test
+    async def _test_conversational_creation(self) -> Tuple[bool, str]:
         """Test conversational agent creation"""
-        start_time = time.time()
-        try:
-            agent = ConversationalAgent(
-                name="ConvTestAgent",
-                system_prompt="You are a test agent.",
-                memory_enabled=True
-            )
-            
-            info = agent.get_agent_info()
-            success = info["name"] == "ConvTestAgent" and info["memory_enabled"]
-            
-            return {
-                "passed": success,
-                "duration": time.time() - start_time,
-                "message": "Conversational agent created successfully"
-            }
-        except Exception as e:
-            return {
-                "passed": False,
-                "duration": time.time() - start_time,
-                "error": str(e)
-            }
+        agent = ConversationalAgent(
+            name="ConvTestAgent",
+            system_prompt="You are a test agent.",
+            memory_enabled=True
+        )
+        
+        info = agent.get_agent_info()
+        success = info["name"] == "ConvTestAgent" and info["memory_enabled"]
+        return success, "Conversational agent created successfully"
     
-    async def _test_chat_functionality(self) -> Dict[str, Any]:
+    @_timed_test
+    async def _test_chat_functionality(self) -> Tuple[bool, str]:
         """Test chat functionality"""
-        start_time = time.time()
-        try:
-            agent = ConversationalAgent(name="ChatTestAgent")
-            
-            # Test multiple interactions
-            response1 = await agent.chat("What is 2+2?")
-            response2 = await agent.chat("Remember that number.")
-            
-            success = all([
-                isinstance(response1, str),
-                isinstance(response2, str),
-                len(response1) > 0,
-                len(response2) > 0
-            ])
-            
-            return {
-                "passed": success,
-                "duration": time.time() - start_time,
-                "message": "Chat functionality working"
-            }
-        except Exception as e:
-            return {
-                "passed": False,
-                "duration": time.time() - start_time,
-                "error": str(e)
-            }
-    
-    async def _test_memory_management(self) -> Dict[str, Any]:
+        agent = ConversationalAgent(name="ChatTestAgent")
+        
+        # Test multiple interactions
+        response1 = await agent.chat("What is 2+2?")
+        response2 = await agent.chat("Remember that number.")
+        
+        success = all([
+            isinstance(response1, str),
+            isinstance(response2, str),
+            len(response1) > 0,
+            len(response2) > 0
+        ])
+        return success, "Chat functionality working"
+    
+    @_timed_test
+    async def _test_memory_management(self) -> Tuple[bool, str]:
         """Test memory management"""
-        start_time = time.time()
-        try:
-            agent = ConversationalAgent(name="MemoryTestAgent", memory_enabled=True)
-            
-            await agent.chat("Remember: my name is Alice")
-            memory_before = len(agent.get_memory())
-            
-            agent.clear_memory()
-            memory_after = len(agent.get_memory())
-            
-            success = memory_before > 0 and memory_after == 0
-            
-            return {
-                "passed": success,
-                "duration": time.time() - start_time,
-                "message": f"Memory management working: {memory_before} -> {memory_after}"
-            }
-        except Exception as e:
-            return {
-                "passed": False,
-                "duration": time.time() - start_time,
-                "error": str(e)
-            }
+        agent = ConversationalAgent(name="MemoryTestAgent", memory_enabled=True)
+        
+        await agent.chat("Remember: my name is Alice")
+        memory_before = len(agent.get_memory())
+        
+        agent.clear_memory()
+        memory_after = len(agent.get_memory())
+        
+        success = memory_before > 0 and memory_after == 0
+        return success, f"Memory management working: {memory_before} -> {memory_after}"
     
-    async def _test_team_conversational(self) -> Dict[str, Any]:
+    @_timed_test
+    async def _test_team_conversational(self) -> Tuple[bool, str]:
         """Test team conversational functionality"""
-        start_time = time.time()
-        try:
-            team_agent = TeamConversationalAgent(
-                name="TeamTestAgent",
-                team_role="coordinator"
-            )
-            
-            team_agent.register_team_member("Agent1", {"role": "worker"})
-            response = await team_agent.team_chat("Coordinate with the team", sender="User")
-            
-            success = isinstance(response, str) and len(response) > 0
-            
-            return {
-                "passed": success,
-                "duration": time.time() - start_time,
-                "message": "Team conversational agent working"
-            }
-        except Exception as e:
-            return {
-                "passed": False,
-                "duration": time.time() - start_time,
-                "error": str(e)
-            }
+        team_agent = TeamConversationalAgent(
+            name="TeamTestAgent",
+            team_role="coordinator"
+        )
+        
+        team_agent.register_team_member("Agent1", {"role": "worker"})
+        response = await team_agent.team_chat("Coordinate with the team", sender="User")
+        
+        success = isinstance(response, str) and len(response) > 0
+        return success, "Team conversational agent working"
+    
+    @_timed_test
+    async def _test_chat_stream(self) -> Tuple[bool, str]:
+        """Test that streamed tokens reassemble into the full reply and are recorded once"""
+        agent = ConversationalAgent(name="StreamTestAgent")
+        tokens = [token async for token in agent.chat_stream("Stream this reply")]
+        
+        # A fresh agent with the same prompt and no history gives the non-streamed reply
+        expected = await ConversationalAgent(name="StreamReferenceAgent").chat("Stream this reply")
+        
+        success = len(tokens) > 1 and "".join(tokens) == expected and len(agent.get_memory()) == 1
+        return success, f"Streamed {len(tokens)} tokens"
     
-    async def _test_tool_agent_creation(self) -> Dict[str, Any]:
+    @_timed_test
+    async def _test_tool_agent_creation(self) -> Tuple[bool, str]:
         """Test tool-enabled agent creation"""
-        start_time = time.time()
-        try:
-            # Mock tool for testing
-            def test_tool(input_text):
-                return f"Tool processed: {input_text}"
-            
-            agent = DialogueAgentWithTools(
-                name="ToolTestAgent",
-                system_message="You are a tool-enabled agent.",
-                tools=[test_tool]
-            )
-            
-            tools_info = agent.get_available_tools()
-            success = len(tools_info) > 0
-            
-            return {
-                "passed": success,
-                "duration": time.time() - start_time,
-                "message": f"Tool agent created with {len(tools_info)} tools"
-            }
-        except Exception as e:
-            return {
-                "passed": False,
-                "duration": time.time() - start_time,
-                "error": str(e)
-            }
+        # Mock tool for testing
+        def test_tool(input_text):
+            return f"Tool processed: {input_text}"
+        
+        agent = DialogueAgentWithTools(
+            name="ToolTestAgent",
+            system_message="You are a tool-enabled agent.",
+            tools=[test_tool]
+        )
+        
+        tools_info = agent.get_available_tools()
+        success = len(tools_info) > 0
+        return success, f"Tool agent created with {len(tools_info)} tools"
     
-    async def _test_tool_integration(self) -> Dict[str, Any]:
+    @_timed_test
+    async def _test_tool_integration(self) -> Tuple[bool, str]:
         """Test tool integration"""
-        start_time = time.time()
-        try:
-            def calculator_tool(expression):
-                """Simple calculator tool"""
-                try:
-                    return str(eval(expression))
-                except:
-                    return "Invalid expression"
-            
-            agent = DialogueAgentWithTools(
-                name="ToolIntegrationAgent",
-                system_message="You have access to a calculator.",
-                tools=[calculator_tool]
-            )
-            
-            response = await agent.send("Calculate 5 + 3")
-            success = isinstance(response, str) and len(response) > 0
-            
-            return {
-                "passed": success,
-                "duration": time.time() - start_time,
-                "message": "Tool integration working"
-            }
-        except Exception as e:
-            return {
-                "passed": False,
-                "duration": time.time() - start_time,
-                "error": str(e)
-            }
+        def calculator_tool(expression):
+            """Simple calculator tool"""
+            try:
+                return str(eval(expression))
+            except:
+                return "Invalid expression"
+        
+        agent = DialogueAgentWithTools(
+            name="ToolIntegrationAgent",
+            system_message="You have access to a calculator.",
+            tools=[calculator_tool]
+        )
+        
+        response = await agent.send("Calculate 5 + 3")
+        success = isinstance(response, str) and len(response) > 0
+        return success, "Tool integration working"
     
-    async def _test_tool_statistics(self) -> Dict[str, Any]:
+    @_timed_test
+    async def _test_tool_statistics(self) -> Tuple[bool, str]:
         """Test tool usage statistics"""
-        start_time = time.time()
-        try:
-            def test_tool(input_text):
-                return f"Processed: {input_text}"
-            
-            agent = DialogueAgentWithTools(
-                name="StatsTestAgent",
-                system_message="You are a stats test agent.",
-                tools=[test_tool]
-            )
-            
-            await agent.send("Use the test tool")
-            stats = agent.get_stats()
-            
-            success = "tools_count" in stats and stats["tools_count"] > 0
-            
-            return {
-                "passed": success,
-                "duration": time.time() - start_time,
-                "message": "Tool statistics working"
-            }
-        except Exception as e:
-            return {
-                "passed": False,
-                "duration": time.time() - start_time,
-                "error": str(e)
-            }
+        def test_tool(input_text):
+            return f"Processed: {input_text}"
+        
+        agent = DialogueAgentWithTools(
+            name="StatsTestAgent",
+            system_message="You are a stats test agent.",
+            tools=[test_tool]
+        )
+        
+        await agent.send("Use the test tool")
+        stats = agent.get_stats()
+        
+        success = "tools_count" in stats and stats["tools_count"] > 0
+        return success, "Tool statistics working"
     
     # Additional test implementations (simplified for brevity)
-    async def _test_team_formation(self) -> Dict[str, Any]:
-        start_time = time.time()
-        try:
-            agent1 = TeamDialogueAgent("Agent1", "You are agent 1", "leader", [])
-            agent2 = TeamDialogueAgent("Agent2", "You are agent 2", "worker", [])
-            return {"passed": True, "duration": time.time() - start_time, "message": "Team formation successful"}
-        except Exception as e:
-            return {"passed": False, "duration": time.time() - start_time, "error": str(e)}
-    
-    async def _test_inter_agent_communication(self) -> Dict[str, Any]:
-        start_time = time.time()
-        try:
-            agent = TeamDialogueAgent("CommAgent", "You coordinate", "coordinator", [])
-            response = await agent.coordinate_with_team("Test coordination", ["Agent1"])
-            return {"passed": len(response) > 0, "duration": time.time() - start_time, "message": "Inter-agent communication working"}
-        except Exception as e:
-            return {"passed": False, "duration": time.time() - start_time, "error": str(e)}
-    
-    async def _test_shared_context(self) -> Dict[str, Any]:
-        start_time = time.time()
-        try:
-            agent = TeamConversationalAgent("ContextAgent", "coordinator")
-            agent.update_shared_context({"project": "test_project"})
-            return {"passed": True, "duration": time.time() - start_time, "message": "Shared context working"}
-        except Exception as e:
-            return {"passed": False, "duration": time.time() - start_time, "error": str(e)}
-    
-    async def _test_response_time(self) -> Dict[str, Any]:
-        start_time = time.time()
-        try:
-            agent = ConversationalAgent("SpeedAgent")
-            test_start = time.time()
-            await agent.chat("Quick test")
-            response_time = time.time() - test_start
-            return {"passed": response_time < 5.0, "duration": time.time() - start_time, "message": f"Response time: {response_time:.2f}s"}
-        except Exception as e:
-            return {"passed": False, "duration": time.time() - start_time, "error": str(e)}
-    
-    async def _test_memory_usage(self) -> Dict[str, Any]:
-        start_time = time.time()
-        try:
-            agent = ConversationalAgent("MemoryAgent", memory_enabled=True)
-            for i in range(10):
-                await agent.chat(f"Message {i}")
-            memory_size = len(agent.get_memory())
-            return {"passed": memory_size == 10, "duration": time.time() - start_time, "message": f"Memory usage: {memory_size} items"}
-        except Exception as e:
-            return {"passed": False, "duration": time.time() - start_time, "error": str(e)}
-    
-    async def _test_concurrent_operations(self) -> Dict[str, Any]:
-        start_time = time.time()
-        try:
-            agent = ConversationalAgent("ConcurrentAgent")
-            tasks = [agent.chat(f"Concurrent message {i}") for i in range(5)]
-            responses = await asyncio.gather(*tasks)
-            return {"passed": len(responses) == 5, "duration": time.time() - start_time, "message": f"Concurrent operations: {len(responses)} completed"}
-        except Exception as e:
-            return {"passed": False, "duration": time.time() - start_time, "error": str(e)}
-    
-    async def _test_invalid_input(self) -> Dict[str, Any]:
-        start_time = time.time()
+    @_timed_test
+    async def _test_team_formation(self) -> Tuple[bool, str]:
+        agent1 = TeamDialogueAgent("Agent1", "You are agent 1", "leader", [])
+        agent2 = TeamDialogueAgent("Agent2", "You are agent 2", "worker", [])
+        return True, "Team formation successful"
+    
+    @_timed_test
+    async def _test_inter_agent_communication(self) -> Tuple[bool, str]:
+        agent = TeamDialogueAgent("CommAgent", "You coordinate", "coordinator", [])
+        response = await agent.coordinate_with_team("Test coordination", ["Agent1"])
+        return len(response) > 0, "Inter-agent communication working"
+    
+    @_timed_test
+    async def _test_shared_context(self) -> Tuple[bool, str]:
+        agent = TeamConversationalAgent("ContextAgent", "coordinator")
+        agent.update_shared_context({"project": "test_project"})
+        return True, "Shared context working"
+    
+    @_timed_test
+    async def _test_inmemory_store(self) -> Tuple[bool, str]:
+        """Test append/recent/clear through an agent backed by InMemoryStore"""
+        from xagent_integration.history_store import InMemoryStore
+        return await self._check_history_store(InMemoryStore())
+    
+    @_timed_test
+    async def _test_sqlite_store(self) -> Tuple[bool, str]:
+        """Test append/recent/clear through an agent backed by SQLiteStore"""
+        from xagent_integration.history_store import SQLiteStore
+        return await self._check_history_store(SQLiteStore(":memory:", "SQLiteStoreAgent"))
+    
+    @_timed_test
+    async def _test_redis_store(self) -> Tuple[bool, str]:
+        """Test append/recent/clear through an agent backed by RedisStore with a fake client"""
+        from xagent_integration.history_store import RedisStore
+        store = RedisStore("RedisStoreAgent", client=_FakeRedis(), maxlen=4)
+        success, message = await self._check_history_store(store)
+        
+        # LTRIM keeps each session bounded at maxlen entries
+        for i in range(6):
+            await store.append({"timestamp": i, "user_message": f"Bulk {i}", "agent_response": "ok"})
+        bounded = [entry["user_message"] for entry in await store.recent(10)] == [f"Bulk {i}" for i in range(2, 6)]
+        
+        return success and bounded, f"{message}, bounded to maxlen: {bounded}"
+    
+    async def _check_history_store(self, store: Any) -> Tuple[bool, str]:
+        """Chat through a store-backed agent, then clear it and chat again"""
+        agent = ConversationalAgent("StoreAgent", history_store=store)
+        await agent.chat("First message")
+        await agent.chat("Second message")
+        before = [entry["user_message"] for entry in await store.recent(5)]
+        
+        # The sync path cannot clear a shared store and must refuse
         try:
-            agent = ConversationalAgent("ErrorAgent")
-            response = await agent.chat("")  # Empty input
-            return {"passed": isinstance(response, str), "duration": time.time() - start_time, "message": "Invalid input handled"}
-        except Exception as e:
-            return {"passed": False, "duration": time.time() - start_time, "error": str(e)}
+            agent.clear_memory()
+            refused = False
+        except RuntimeError:
+            refused = True
+        
+        # Other readers must see the store empty as soon as aclear_memory returns
+        await agent.aclear_memory()
+        cleared = await store.recent(5) == [] and not agent.get_memory()
+        
+        await agent.chat("After clear")
+        after = [entry["user_message"] for entry in await store.recent(5)]
+        
+        success = (
+            before == ["First message", "Second message"] and refused and cleared
+            and after == ["After clear"] and await store.recent(0) == []
+        )
+        return success, f"{type(store).__name__}: {len(before)} -> {len(after)} exchanges"
+    
+    @_timed_test
+    async def _test_response_cache(self) -> Tuple[bool, str]:
+        """Test that identical prompts hit the cache and failed calls are never cached"""
+        agent = ConversationalAgent("CacheAgent", memory_enabled=False, cache_responses=True)
+        first = await agent.chat("Cache me")
+        second = await agent.chat("Cache me")
+        hit = second == first and agent.get_agent_info()["cache_hits"] == 1
+        
+        async def _failing_plan_batch(inputs):
+            raise RuntimeError("backend unavailable")
+        
+        # Fail inside the backend, where errors used to come back as plain strings
+        backend = agent.xagent.xagent
+        backend.create_plan_batch = _failing_plan_batch
+        await agent.chat("Do not cache me")
+        del backend.create_plan_batch
+        
+        # The failed request must not leave a user turn without its reply
+        paired = len(agent.xagent.get_memory()) == 2
+        
+        # A cached failure would be served here instead of a fresh response
+        recovered = await agent.chat("Do not cache me")
+        skipped = "backend unavailable" not in recovered and agent.get_agent_info()["cache_hits"] == 1
+        
+        return hit and skipped and paired, f"Cache hit: {hit}, failure skipped: {skipped}, history paired: {paired}"
     
-    async def _test_exception_recovery(self) -> Dict[str, Any]:
-        start_time = time.time()
+    @_timed_test
+    async def _test_reply_many(self) -> Tuple[bool, str]:
+        """Test that reply_many returns one reply per agent, in order"""
+        agents = [DialogueAgentWithTools(f"FanInAgent{i}", "You reply.") for i in range(3)]
+        replies = await DialogueAgentWithTools.reply_many(agents, [f"Question {i}" for i in range(3)])
+        
+        ordered = len(replies) == 3 and all(
+            reply.startswith(f"[FanInAgent{i}]: ") for i, reply in enumerate(replies)
+        )
+        
         try:
-            agent = ConversationalAgent("RecoveryAgent")
-            # This should not crash the agent
-            response = await agent.chat("This is a recovery test")
-            return {"passed": True, "duration": time.time() - start_time, "message": "Exception recovery working"}
-        except Exception as e:
-            return {"passed": False, "duration": time.time() - start_time, "error": str(e)}
-    
-    async def _test_timeout_handling(self) -> Dict[str, Any]:
-        start_time = time.time()
+            await DialogueAgentWithTools.reply_many(agents, ["Only one message"])
+            rejected = False
+        except ValueError:
+            rejected = True
+        
+        return ordered and rejected, f"reply_many: {len(replies)} ordered replies, mismatch rejected: {rejected}"
+    
+    @_timed_test
+    async def _test_response_time(self) -> Tuple[bool, str]:
+        agent = ConversationalAgent("SpeedAgent")
+        test_start = _perf()
+        await agent.chat("Quick test")
+        response_time = _perf() - test_start
+        return response_time < 5.0, f"Response time: {response_time:.2f}s"
+    
+    @_timed_test
+    async def _test_memory_usage(self) -> Tuple[bool, str]:
+        agent = ConversationalAgent("MemoryAgent", memory_enabled=True)
+        await _gather(*(agent.chat(message) for message in self._MEMORY_USAGE_MESSAGES))
+        memory_size = len(agent.get_memory())
+        return memory_size == len(self._MEMORY_USAGE_MESSAGES), f"Memory usage: {memory_size} items"
+    
+    @_timed_test
+    async def _test_concurrent_operations(self) -> Tuple[bool, str]:
+        agent = ConversationalAgent("ConcurrentAgent")
+        tasks = [agent.chat(f"Concurrent message {i}") for i in range(5)]
+        responses = await _gather(*tasks)
+        return len(responses) == 5, f"Concurrent operations: {len(responses)} completed"
+    
+    @_timed_test
+    async def _test_batch_overlap(self) -> Tuple[bool, str]:
+        """Test that more than max_batch concurrent runs do not queue behind each other"""
+        wrapper = XAgentWrapper(agent_name="BatchOverlapAgent", max_batch=4)
+        
+        async def _slow_plan_batch(inputs):
+            await _sleep(self._SLOW_BACKEND_LATENCY)
+            return [{"steps": [{"action": "analyze", "target": text}]} for text in inputs]
+        
+        wrapper.xagent.create_plan_batch = _slow_plan_batch
+        
+        runs = 4 * wrapper._batcher.max_batch
+        start = _perf()
+        responses = await _gather(*(wrapper.run(f"Overlap {i}") for i in range(runs)))
+        elapsed = _perf() - start
+        
+        completed = sum("Task completed successfully" in response for response in responses)
+        success = completed == runs and elapsed < 2 * self._SLOW_BACKEND_LATENCY
+        return success, f"{completed}/{runs} runs in {elapsed:.2f}s (backend latency {self._SLOW_BACKEND_LATENCY}s)"
+    
+    @_timed_test
+    async def _test_blocking_backend_offload(self) -> Tuple[bool, str]:
+        """Test that blocking backend calls run on worker threads and overlap"""
+        wrapper = XAgentWrapper(agent_name="BlockingBackendAgent")
+        caller_threads = set()
+        
+        def _blocking_plan_batch(inputs):
+            caller_threads.add(threading.get_ident())
+            time.sleep(self._SLOW_BACKEND_LATENCY)
+            return [{"steps": [{"action": "analyze", "target": text}]} for text in inputs]
+        
+        wrapper.xagent.create_plan_batch = _blocking_plan_batch
+        
+        # Inputs of different magnitudes land in separate length bins, one backend call each
+        inputs = ["x" * 10 ** i for i in range(4)]
+        start = _perf()
+        responses = await _gather(*(wrapper.run(text) for text in inputs))
+        elapsed = _perf() - start
+        
+        completed = sum("Task completed successfully" in response for response in responses)
+        success = (
+            completed == len(inputs)
+            and threading.get_ident() not in caller_threads
+            and elapsed < 2 * self._SLOW_BACKEND_LATENCY
+        )
+        return success, f"{completed}/{len(inputs)} blocking calls on {len(caller_threads)} worker threads in {elapsed:.2f}s"
+    
+    @_timed_test
+    async def _test_invalid_input(self) -> Tuple[bool, str]:
+        agent = ConversationalAgent("ErrorAgent")
+        response = await agent.chat("")  # Empty input
+        return isinstance(response, str), "Invalid input handled"
+    
+    @_timed_test
+    async def _test_exception_recovery(self) -> Tuple[bool, str]:
+        agent = ConversationalAgent("RecoveryAgent")
+        # This should not crash the agent
+        response = await agent.chat("This is a recovery test")
+        return True, "Exception recovery working"
+    
+    @_timed_test
+    async def _test_timeout_handling(self) -> Tuple[bool, str]:
+        agent = ConversationalAgent("TimeoutAgent")
         try:
-            agent = ConversationalAgent("TimeoutAgent")
-            response = await agent.chat("Test timeout handling")
-            return {"passed": True, "duration": time.time() - start_time, "message": "Timeout handling working"}
-        except Exception as e:
-            return {"passed": False, "duration": time.time() - start_time, "error": str(e)}
+            response = await asyncio.wait_for(agent.chat("Test timeout handling"), timeout=self._CHAT_TIMEOUT)
+            return isinstance(response, str), "Timeout handling working: completed within limit"
+        except asyncio.TimeoutError:
+            return True, f"Timeout handling working: chat cancelled after {self._CHAT_TIMEOUT}s"
+
+
+async def _write_ndjson(result_queue: asyncio.Queue, path: str):
+    """Drain test results into an NDJSON file until a None sentinel arrives"""
+    with open(path, "wb") as f:
+        done = False
+        while not done:
+            # Coalesce everything already queued into a single write
+            records = [await result_queue.get()]
+            while not result_queue.empty():
+                records.append(result_queue.get_nowait())
+            if records[-1] is None:
+                records.pop()
+                done = True
+            f.write(b"".join(_dumps(record) + b"\n" for record in records))
 
 
 # Main test execution function
 async def main():
     """Main test execution"""
-    test_suite = XAgentL3AGITestSuite()
-    
-    print("🚀 Starting XAgent-L3AGI Integration Test Suite")
-    print("=" * 60)
-    
-    results = await test_suite.run_all_tests()
-    
-    # Print results
-    print("\n📊 TEST RESULTS")
-    print("=" * 60)
+    # PYTHONASYNCIODEBUG / -X dev would add per-callback bookkeeping to every await
+    asyncio.get_running_loop().set_debug(False)
+    with _queued_logging():
+        return await _run_main()
+
+
+def _format_report(results: Dict[str, Any]) -> str:
+    """Build the printable results report as a single string"""
+    lines = ["", "📊 TEST RESULTS", "=" * 60]
     
     for category, category_results in results["categories"].items():
-        print(f"\n{category}:")
-        print(f"  ✅ Passed: {category_results['passed']}")
-        print(f"  ❌ Failed: {category_results['failed']}")
-        print(f"  📈 Success Rate: {(category_results['passed'] / category_results['total'] * 100):.1f}%")
-    
-    print(f"\n🎯 OVERALL SUMMARY:")
-    print(f"  Total Tests: {results['summary']['total_tests']}")
-    print(f"  Passed: {results['summary']['passed']}")
-    print(f"  Failed: {results['summary']['failed']}")
-    print(f"  Success Rate: {results['summary']['success_rate']:.1f}%")
-    print(f"  Duration: {results['summary']['duration']:.2f} seconds")
+        lines.extend((
+            f"\n{category}:",
+            f"  ✅ Passed: {category_results['passed']}",
+            f"  ❌ Failed: {category_results['failed']}",
+            f"  📈 Success Rate: {(category_results['passed'] / category_results['total'] * 100):.1f}%"
+        ))
+    
+    summary = results["summary"]
+    lines.extend((
+        "\n🎯 OVERALL SUMMARY:",
+        f"  Total Tests: {summary['total_tests']}",
+        f"  Passed: {summary['passed']}",
+        f"  Failed: {summary['failed']}",
+        f"  Success Rate: {summary['success_rate']:.1f}%",
+        f"  Duration: {summary['duration']:.2f} seconds",
+        "\n💾 Results saved to test_results.json (per-test results in test_results.ndjson)",
+        ""
+    ))
+    return "\n".join(lines)
+
+
+async def _run_main():
+    """Run the suite, print the report and save results"""
+    # Per-test results are streamed to NDJSON while the suite runs
+    result_queue = asyncio.Queue()
+    writer = asyncio.create_task(_write_ndjson(result_queue, "test_results.ndjson"))
+    test_suite = XAgentL3AGITestSuite(result_queue=result_queue)
+    
+    sys.stdout.write("🚀 Starting XAgent-L3AGI Integration Test Suite\n" + "=" * 60 + "\n")
+    sys.stdout.flush()
+    
+    try:
+        results = await test_suite.run_all_tests()
+    finally:
+        result_queue.put_nowait(None)
+        await writer
     
     # Save results to file
-    with open("test_results.json", "w") as f:
-        json.dump(results, f, indent=2, default=str)
+    payload = _dumps(results, indent=True)
+    with open("test_results.json", "wb") as f:
+        f.write(payload)
     
-    print(f"\n💾 Results saved to test_results.json")
+    # Emit the whole report in one write
+    sys.stdout.write(_format_report(results))
+    sys.stdout.flush()
     
     return results
 
 
+# asyncio.Runner is Python 3.11+; older interpreters get a fresh loop per asyncio.run()
+_HAVE_RUNNER = hasattr(asyncio, "Runner")
+_runner: Optional["asyncio.Runner"] = None
+
+
+def run_suite_once() -> Dict[str, Any]:
+    """Run the suite synchronously, reusing one event loop across in-process reruns"""
+    global _runner
+    if not _HAVE_RUNNER:
+        return asyncio.run(main(), debug=False)
+    if _runner is None:
+        _runner = asyncio.Runner(debug=False)
+        atexit.register(_runner.close)
+    return _runner.run(main())
+
+
 # Export for L3AGI integration
-__all__ = ["XAgentL3AGITestSuite", "main"]
+__all__ = ["XAgentL3AGITestSuite", "main", "run_suite_once"]
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    # Prefer libuv-based event loop for the many tiny awaits in the suite
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
+    
+    if _HAVE_RUNNER:
+        with asyncio.Runner(debug=False) as runner:
+            runner.run(main())
+    else:
+        asyncio.run(main(), debug=False)
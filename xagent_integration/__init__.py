@@ -4,6 +4,7 @@ Provides XAgent integration components for L3AGI framework
 """
 
 from .xagent_core import XAgentWrapper, AgentMessage, create_xagent_from_langchain_config
+from .history_store import HistoryStore, InMemoryStore, RedisStore, SQLiteStore
 from .l3agi_compatibility import (
     ConversationalXAgent,
     DialogueAgentWithToolsXAgent, 
@@ -22,5 +23,9 @@ __all__ = [
     "ConversationalXAgent",
     "DialogueAgentWithToolsXAgent",
     "XAgentTestInterface",
-    "LangchainToXAgentMigrator"
+    "LangchainToXAgentMigrator",
+    "HistoryStore",
+    "InMemoryStore",
+    "RedisStore",
+    "SQLiteStore"
 ]
@@ -0,0 +1,148 @@
+"""
+Conversation History Stores
+Pluggable history persistence so L3AGI agents can share sessions across workers
+"""
+
+import asyncio
+import sqlite3
+from collections import deque
+from typing import Any, Dict, List, Protocol, runtime_checkable
+
+from .xagent_core import _dumps, _loads
+
+# Optional Redis backend
+try:
+    import redis.asyncio as aioredis
+except ImportError:
+    aioredis = None
+
+
+@runtime_checkable
+class HistoryStore(Protocol):
+    """Storage interface for conversation history entries"""
+
+    async def append(self, entry: Dict[str, Any]) -> None:
+        """Append a history entry"""
+        ...
+
+    async def recent(self, k: int) -> List[Dict[str, Any]]:
+        """Return the k most recent entries, oldest first"""
+        ...
+
+    async def clear(self) -> None:
+        """Remove all entries"""
+        ...
+
+
+class InMemoryStore:
+    """Process-local bounded store backed by a deque"""
+
+    def __init__(self, maxlen: int = 1024):
+        self._entries = deque(maxlen=maxlen)
+
+    async def append(self, entry: Dict[str, Any]) -> None:
+        self._entries.append(entry)
+
+    async def recent(self, k: int) -> List[Dict[str, Any]]:
+        start = max(0, len(self._entries) - k)
+        return [self._entries[i] for i in range(start, len(self._entries))]
+
+    async def clear(self) -> None:
+        self._entries.clear()
+
+
+class RedisStore:
+    """
+    Redis list store keyed by agent name + session id
+    Bounded with LPUSH + LTRIM so each session keeps at most maxlen entries
+    """
+
+    def __init__(self, agent_name: str, session_id: str = "default",
+                 url: str = "redis://localhost:6379/0", maxlen: int = 1024, client: Any = None):
+        if client is None:
+            if aioredis is None:
+                raise ImportError("RedisStore requires the 'redis' package (redis.asyncio)")
+            client = aioredis.from_url(url)
+
+        self.client = client
+        self.key = f"l3agi:history:{agent_name}:{session_id}"
+        self.maxlen = maxlen
+
+    async def append(self, entry: Dict[str, Any]) -> None:
+        payload = _dumps(entry)
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.lpush(self.key, payload)
+            pipe.ltrim(self.key, 0, self.maxlen - 1)
+            await pipe.execute()
+
+    async def recent(self, k: int) -> List[Dict[str, Any]]:
+        # lrange(key, 0, -1) would return the whole list
+        if k <= 0:
+            return []
+        raw = await self.client.lrange(self.key, 0, k - 1)
+        return [_loads(item) for item in reversed(raw)]
+
+    async def clear(self) -> None:
+        await self.client.delete(self.key)
+
+
+class SQLiteStore:
+    """
+    Append-only SQLite store: messages(session_id, ts, role, content)
+    Each exchange is stored as a user row followed by an assistant row
+    """
+
+    def __init__(self, path: str, agent_name: str, session_id: str = "default"):
+        self.session_id = f"{agent_name}:{session_id}"
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = asyncio.Lock()
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS messages ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT NOT NULL, "
+            "ts INTEGER NOT NULL, role TEXT NOT NULL, content TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_messages_session ON messages (session_id, id)")
+        self._conn.commit()
+
+    async def append(self, entry: Dict[str, Any]) -> None:
+        rows = [
+            (self.session_id, entry["timestamp"], "user", entry["user_message"]),
+            (self.session_id, entry["timestamp"], "assistant", entry["agent_response"])
+        ]
+        async with self._lock:
+            await asyncio.to_thread(self._insert, rows)
+
+    def _insert(self, rows: List[tuple]):
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO messages (session_id, ts, role, content) VALUES (?, ?, ?, ?)", rows
+            )
+
+    async def recent(self, k: int) -> List[Dict[str, Any]]:
+        async with self._lock:
+            rows = await asyncio.to_thread(self._select_recent, 2 * k)
+
+        # Rows come back newest first; pair them back into exchanges
+        rows.reverse()
+        entries = []
+        for i in range(0, len(rows) - 1, 2):
+            (ts, _, user_message), (_, _, agent_response) = rows[i], rows[i + 1]
+            entries.append({"timestamp": ts, "user_message": user_message, "agent_response": agent_response})
+        return entries
+
+    def _select_recent(self, limit: int) -> List[tuple]:
+        return self._conn.execute(
+            "SELECT ts, role, content FROM messages WHERE session_id = ? ORDER BY id DESC LIMIT ?",
+            (self.session_id, limit)
+        ).fetchall()
+
+    async def clear(self) -> None:
+        async with self._lock:
+            await asyncio.to_thread(self._delete)
+
+    def _delete(self):
+        with self._conn:
+            self._conn.execute("DELETE FROM messages WHERE session_id = ?", (self.session_id,))
+
+
+__all__ = ["HistoryStore", "InMemoryStore", "RedisStore", "SQLiteStore"]
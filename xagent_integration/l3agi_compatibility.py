@@ -6,96 +6,146 @@ Provides seamless replacement of Langchain REACT agents with XAgent
 import asyncio
 import json
 import logging
-from typing import Any, Dict, List, Optional, Union, Callable
-from datetime import datetime
+import re
+import time
+from itertools import islice
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Union, Callable
 from .xagent_core import XAgentWrapper, AgentMessage
 
+# Zero-width split points before each word that follows whitespace
+_TOKEN_BOUNDARY = re.compile(r"(?<=\s)(?=\S)")
+
 class ConversationalXAgent(XAgentWrapper):
     """
     XAgent wrapper for conversational.py replacement
     Maintains L3AGI conversational interface while using XAgent backend
+    
+    Note: ``tools`` is shared by reference with the owning ConversationalAgent;
+    mutate it in place and never reassign it
     """
     
-    def __init__(self, **kwargs):
+    def __init__(self, system_prompt: str = "You are a helpful AI assistant.", **kwargs):
         super().__init__(**kwargs)
-        self.conversation_context = []
-        self.system_prompt = kwargs.get("system_prompt", "You are a helpful AI assistant.")
+        self.system_prompt = system_prompt
+        # (key, prefix) for _format_conversation_input
+        self._prefix_cache = (None, "")
     
     async def chat(self, message: str, context: List[Dict] = None) -> str:
-        """Main chat method for conversational interface"""
-        if context:
-            self.conversation_context.extend(context)
-        
+        """
+        Main chat method for conversational interface
+        context is the caller's rolling view of recent messages and is not retained here
+        Raises on backend failure so error text is never mistaken for a response
+        """
         # Format conversation for XAgent
-        formatted_input = self._format_conversation_input(message)
+        formatted_input = self._format_conversation_input(message, context)
         
         # Execute with XAgent
-        response = await self.run(formatted_input)
+        response = await self._run(formatted_input)
         
         return self._format_conversation_output(response)
     
-    def _format_conversation_input(self, message: str) -> str:
+    async def chat_stream(self, message: str, context: List[Dict] = None) -> AsyncIterator[str]:
+        """
+        Streaming chat - yields response tokens as they become available
+        The simulated backend returns whole responses, so tokens are emitted on word boundaries
+        """
+        response = await self.chat(message, context)
+        for token in _TOKEN_BOUNDARY.split(response):
+            yield token
+    
+    def _format_conversation_input(self, message: str, context: Optional[Sequence[Dict]] = None) -> str:
         """Format conversation input for XAgent processing"""
-        context_str = ""
-        if self.conversation_context:
-            context_str = "Previous conversation:\n"
-            for msg in self.conversation_context[-5:]:  # Last 5 messages
-                context_str += f"- {msg.get('role', 'user')}: {msg.get('content', '')}\n"
+        context = context or ()
+        recent = tuple(
+            (msg.get('role', 'user'), msg.get('content', ''))
+            for msg in islice(context, max(0, len(context) - 5), None)  # Last 5 messages
+        )
+        
+        # The system + history prefix only changes when the prompt or recent context does
+        key = (self.system_prompt, recent)
+        if self._prefix_cache[0] != key:
+            context_str = ""
+            if recent:
+                context_str = "Previous conversation:\n" + "".join(
+                    f"- {role}: {content}\n" for role, content in recent
+                )
+            self._prefix_cache = (key, f"{self.system_prompt}\n\n{context_str}\nCurrent message: ")
         
-        return f"{self.system_prompt}\n\n{context_str}\nCurrent message: {message}"
+        return self._prefix_cache[1] + message
     
     def _format_conversation_output(self, response: str) -> str:
         """Format XAgent response for L3AGI conversation interface"""
-        # Remove XAgent internal formatting if present
-        if "[Reflection]" in response:
-            response = response.split("[Reflection]")[0].strip()
-        
-        return response
+        # Remove XAgent internal formatting if present; partition stops at the first marker
+        head, sep, _ = response.partition("[Reflection]")
+        return head.strip() if sep else response
 
 
 class DialogueAgentWithToolsXAgent(XAgentWrapper):
     """
     XAgent wrapper for dialogue_agent_with_tools.py replacement
     Provides tool-enabled dialogue capabilities using XAgent
+    
+    Note: ``tools`` is shared by reference with the owning DialogueAgentWithTools;
+    mutate it in place, then call set_tools so the cached prompt text is rebuilt
     """
     
-    def __init__(self, name: str, tools: List[Any], **kwargs):
+    def __init__(self,
+                 name: str,
+                 tools: List[Any],
+                 system_prompt: str = None,
+                 role: str = "assistant",
+                 description: str = None,
+                 **kwargs):
         super().__init__(agent_name=name, tools=tools, **kwargs)
-        self.agent_role = kwargs.get("role", "assistant")
-        self.agent_description = kwargs.get("description", f"AI agent {name}")
+        self.system_prompt = system_prompt
+        self.agent_role = role
+        self.agent_description = description or f"AI agent {name}"
+        self._response_prefix = f"[{self.agent_name}]: "
+        self._rebuild_prompt_cache()
+    
+    def set_tools(self, tools: List[Any]):
+        """Use the given tool list (by reference) and rebuild tool-dependent prompt text"""
+        self.tools = tools
+        self._rebuild_prompt_cache()
+    
+    def _rebuild_prompt_cache(self):
+        """Precompute the send() prefix and tool context; only changes with the tool set"""
+        self._send_prefix = (
+            f"\nAgent Role: {self.agent_role}\n"
+            f"Description: {self.agent_description}\n"
+            f"Available Tools: {', '.join(map(str, self.tools))}\n"
+            f"\nUser Message: "
+        )
+        self._tool_context = self._build_tool_context()
     
     async def send(self, message: str, **kwargs) -> str:
-        """Send message method compatible with L3AGI dialogue agent interface"""
-        tool_context = self._prepare_tool_context()
+        """
+        Send message method compatible with L3AGI dialogue agent interface
+        Raises on backend failure so error text is never mistaken for a response
+        """
+        enhanced_message = self._send_prefix + message + "\n"
         
-        enhanced_message = f"""
-Agent Role: {self.agent_role}
-Description: {self.agent_description}
-Available Tools: {', '.join([str(tool) for tool in self.tools])}
-
-User Message: {message}
-"""
-        
-        response = await self.run(enhanced_message, **kwargs)
+        response = await self._run(enhanced_message, **kwargs)
         return self._format_dialogue_response(response)
     
     def _prepare_tool_context(self) -> str:
         """Prepare context about available tools"""
+        return self._tool_context
+    
+    def _build_tool_context(self) -> str:
+        """Describe the available tools"""
         if not self.tools:
             return "No tools available."
         
-        tool_descriptions = []
-        for tool in self.tools:
-            if hasattr(tool, 'description'):
-                tool_descriptions.append(f"- {tool.__name__}: {tool.description}")
-            else:
-                tool_descriptions.append(f"- {str(tool)}")
-        
-        return "Available tools:\n" + "\n".join(tool_descriptions)
+        tool_descriptions = "\n".join(
+            f"- {tool.__name__}: {tool.description}" if hasattr(tool, 'description') else f"- {str(tool)}"
+            for tool in self.tools
+        )
+        return f"Available tools:\n{tool_descriptions}"
     
     def _format_dialogue_response(self, response: str) -> str:
         """Format response for dialogue agent interface"""
-        return f"[{self.agent_name}]: {response}"
+        return self._response_prefix + response
     
     def describe(self) -> str:
         """Get agent description - L3AGI compatibility"""
@@ -108,9 +158,11 @@ class XAgentTestInterface:
     Provides testing capabilities for XAgent integration
     """
     
-    def __init__(self):
+    def __init__(self, data_parallel: int = 16):
         self.test_agents = {}
         self.test_results = []
+        # Maximum number of test cases in flight at once
+        self.data_parallel = data_parallel
         self.logger = logging.getLogger("XAgent.TestInterface")
     
     def create_test_agent(self, name: str, config: Dict[str, Any]) -> XAgentWrapper:
@@ -128,8 +180,36 @@ class XAgentTestInterface:
             "test_details": []
         }
         
-        for i, test_case in enumerate(test_cases):
-            result = await self._run_single_test(test_case, i)
+        # Test cases are I/O bound, so overlap them under a bounded semaphore
+        sem = asyncio.Semaphore(self.data_parallel)
+        
+        async def _bounded(test_case: Dict[str, Any], test_id: int) -> Dict[str, Any]:
+            async with sem:
+                return await self._run_single_test(test_case, test_id)
+        
+        # Submit everything at once in input-length order; the semaphore admits waiters
+        # FIFO, so cases of similar length run side by side
+        order = sorted(range(len(test_cases)), key=lambda i: len(test_cases[i].get("input", "")))
+        ordered_results = await asyncio.gather(
+            *(_bounded(test_cases[i], i) for i in order),
+            return_exceptions=True
+        )
+        
+        details = [None] * len(test_cases)
+        for i, result in zip(order, ordered_results):
+            details[i] = result
+        
+        for i, (test_case, result) in enumerate(zip(test_cases, details)):
+            if isinstance(result, BaseException):
+                result = {
+                    "test_id": i,
+                    "agent": test_case.get("agent", "unknown"),
+                    "input": test_case.get("input", ""),
+                    "output": f"Error: {str(result)}",
+                    "expected": test_case.get("expected", None),
+                    "status": "failed",
+                    "duration": 0
+                }
             results["test_details"].append(result)
             
             if result["status"] == "passed":
@@ -154,9 +234,9 @@ class XAgentTestInterface:
             agent = self.test_agents[agent_name]
             
             # Run test
-            start_time = datetime.now()
+            start_time = time.perf_counter()
             response = await agent.run(input_text)
-            end_time = datetime.now()
+            duration = time.perf_counter() - start_time
             
             # Evaluate result
             status = "passed"
@@ -170,7 +250,7 @@ class XAgentTestInterface:
                 "output": response,
                 "expected": expected_output,
                 "status": status,
-                "duration": (end_time - start_time).total_seconds()
+                "duration": duration
             }
         
         except Exception as e:
@@ -198,6 +278,17 @@ class XAgentTestInterface:
 
 
 # Migration utilities
+_REPLACEMENT_IMPORTS = '''
+# XAgent replacements for Langchain imports
+from xagent_integration.l3agi_compatibility import (
+    ConversationalXAgent as ConversationalReActAgent,
+    DialogueAgentWithToolsXAgent as DialogueAgentWithTools,
+    XAgentTestInterface as TestInterface
+)
+from xagent_integration.xagent_core import XAgentWrapper as Agent
+'''
+
+
 class LangchainToXAgentMigrator:
     """Utility class for migrating from Langchain to XAgent"""
     
@@ -226,15 +317,7 @@ class LangchainToXAgentMigrator:
     @staticmethod
     def create_replacement_imports() -> str:
         """Generate replacement import statements"""
-        return '''
-# XAgent replacements for Langchain imports
-from xagent_integration.l3agi_compatibility import (
-    ConversationalXAgent as ConversationalReActAgent,
-    DialogueAgentWithToolsXAgent as DialogueAgentWithTools,
-    XAgentTestInterface as TestInterface
-)
-from xagent_integration.xagent_core import XAgentWrapper as Agent
-'''
+        return _REPLACEMENT_IMPORTS
 
 
 # Export compatibility classes
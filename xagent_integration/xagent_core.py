@@ -4,10 +4,17 @@ Provides seamless XAgent integration to replace Langchain REACT agents in L3AGI
 """
 
 import asyncio
+import functools
+import hashlib
 import json
 import logging
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, List, Optional, Callable
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass, is_dataclass
 from datetime import datetime
 
 # XAgent imports (simulated for integration)
@@ -19,7 +26,50 @@ except ImportError:
     # Fallback implementation for demonstration
     print("XAgent not installed - using simulation mode")
 
-@dataclass
+# Resolved once at import instead of probing globals() per construction
+_HAVE_XAGENT = 'XAgent' in globals()
+_HAVE_TOOL_SERVER = 'ToolServerInterface' in globals()
+
+# Optional TTL cache implementation for response caching
+try:
+    from cachetools import TTLCache
+except ImportError:
+    TTLCache = None
+
+# Optional fast JSON codec for plans, messages and cache keys
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _json_default(obj: Any) -> Any:
+    """Stdlib fallback for types orjson serializes natively"""
+    if is_dataclass(obj):
+        return asdict(obj)
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    return str(obj)
+
+
+if orjson is not None:
+    def _dumps(obj: Any, sort_keys: bool = False) -> bytes:
+        """Serialize to compact JSON bytes"""
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        return orjson.dumps(obj, default=str, option=option)
+
+    _loads = orjson.loads
+else:
+    _COMPACT_ENCODER = json.JSONEncoder(separators=(",", ":"), default=_json_default)
+    _SORTED_ENCODER = json.JSONEncoder(separators=(",", ":"), sort_keys=True, default=_json_default)
+
+    def _dumps(obj: Any, sort_keys: bool = False) -> bytes:
+        """Serialize to compact JSON bytes"""
+        return (_SORTED_ENCODER if sort_keys else _COMPACT_ENCODER).encode(obj).encode()
+
+    _loads = json.loads
+
+@dataclass(slots=True)
 class AgentMessage:
     """Message structure for agent communication"""
     role: str
@@ -27,12 +77,171 @@ class AgentMessage:
     timestamp: datetime
     metadata: Dict[str, Any] = None
 
+class _AgentLoggerAdapter(logging.LoggerAdapter):
+    """Shared module logger that tags records with the agent name"""
+
+    def process(self, msg, kwargs):
+        return f"[{self.extra['agent_name']}] {msg}", kwargs
+
+
+class _BatchQueue:
+    """
+    Async micro-batcher that coalesces concurrent submissions
+    into a single handler invocation
+    
+    A lone submission is dispatched immediately. Each batch runs as its own task,
+    so batches overlap and the worker keeps draining. The worker task exits once
+    the queue drains, so an idle batcher holds no task.
+    """
+
+    def __init__(self, handler: Callable, max_batch: int = 32, max_wait_ms: float = 0):
+        """
+        handler receives a list of items and returns a list of results (or exceptions)
+        max_wait_ms only applies when other items are already queued
+        """
+        self.handler = handler
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._pending = deque()
+        self._worker = None
+        self._loop = None
+        # Strong references to in-flight batches so they are not garbage collected
+        self._inflight = set()
+
+    async def submit(self, item: Any) -> Any:
+        """Queue an item and wait for its batched result"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Futures are bound to their loop; drop anything left from a previous one
+            self._loop = loop
+            self._pending = deque()
+            self._worker = None
+            self._inflight = set()
+
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if self._worker is None or self._worker.done():
+            self._worker = loop.create_task(self._run())
+        return await future
+
+    async def _run(self):
+        """Dispatch queued items in batches of up to max_batch until the queue drains"""
+        while self._pending:
+            if self.max_wait > 0 and 1 < len(self._pending) < self.max_batch:
+                # A burst is in progress - give it a moment to fill the batch
+                await asyncio.sleep(self.max_wait)
+
+            batch = [self._pending.popleft() for _ in range(min(self.max_batch, len(self._pending)))]
+            task = asyncio.get_running_loop().create_task(self._dispatch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, batch: List[tuple]):
+        """Invoke handler once for the batch and resolve futures"""
+        try:
+            results = await self.handler([item for item, _ in batch])
+        except asyncio.CancelledError:
+            for _, future in batch:
+                future.cancel()
+            raise
+        except Exception as e:
+            results = [e] * len(batch)
+
+        if len(results) != len(batch):
+            error = RuntimeError(f"Batch handler returned {len(results)} results for {len(batch)} items")
+            results = [error] * len(batch)
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def close(self):
+        """Cancel the worker, in-flight batches and any queued submissions"""
+        if self._worker is not None and not self._worker.done():
+            self._worker.cancel()
+        self._worker = None
+
+        for task in self._inflight:
+            task.cancel()
+        self._inflight = set()
+
+        while self._pending:
+            _, future = self._pending.popleft()
+            future.cancel()
+
+
+class _ResponseCache:
+    """
+    TTL-bounded LRU cache for agent responses
+    Uses cachetools.TTLCache when installed, otherwise an OrderedDict fallback
+    """
+
+    def __init__(self, maxsize: int = 4096, ttl: float = 600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        # get/set never await, so they are atomic with respect to the event loop
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl) if TTLCache is not None else OrderedDict()
+
+    @classmethod
+    def make_key(cls, *parts: Any) -> bytes:
+        """Hash the prompt components into a compact cache key"""
+        return hashlib.blake2b(_dumps(parts, sort_keys=True), digest_size=16).digest()
+
+    def get(self, key: bytes) -> Optional[str]:
+        """Return cached response or None, updating hit/miss counters"""
+        if TTLCache is not None:
+            value = self._cache.get(key)
+        else:
+            value = None
+            item = self._cache.get(key)
+            if item is not None:
+                expires_at, cached = item
+                if expires_at > time.monotonic():
+                    self._cache.move_to_end(key)
+                    value = cached
+                else:
+                    del self._cache[key]
+
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: bytes, value: str):
+        """Store a response, evicting least recently used entries"""
+        if TTLCache is not None:
+            self._cache[key] = value
+            return
+
+        self._cache[key] = (time.monotonic() + self.ttl, value)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+
+    def clear(self):
+        self._cache.clear()
+
+
 class XAgentWrapper:
     """
     XAgent wrapper that provides Langchain REACT Agent compatibility
     for seamless integration with L3AGI framework
     """
     
+    # Plan step action -> result formatter; unknown actions fall back to a generic message
+    _ACTION_HANDLERS = {
+        "analyze": lambda target: f"Analysis of: {target}",
+        "execute": lambda target: f"Executed: {target}",
+        "validate": lambda target: f"Validated: {target}",
+    }
+    
     def __init__(self, 
                  agent_name: str = "XAgent",
                  tools: List[Any] = None,
@@ -42,16 +251,32 @@ class XAgentWrapper:
         self.agent_name = agent_name
         self.tools = tools or []
         self.memory_config = memory_config or {}
-        self.conversation_history = []
+        # Resolved once so the per-request path does no dict lookups
+        self._reflect_enabled = bool(self.memory_config.get("enable_reflection", True))
+        self.max_chain_length = kwargs.get("max_chain_length", 10)
+        self.tool_server_url = kwargs.get("tool_server_url", "http://localhost:8080")
+        # Bounded history; oldest messages are evicted in O(1)
+        self.conversation_history = deque(maxlen=self.memory_config.get("max_history", 1000))
         self.logger = logging.getLogger(f"XAgent.{agent_name}")
         
-        # Initialize XAgent core
+        # Coalesce concurrent run() calls into batched planning/execution
+        self._batcher = _BatchQueue(
+            self._run_batch,
+            max_batch=kwargs.pop("max_batch", 8),
+            max_wait_ms=kwargs.pop("max_wait_ms", 0)
+        )
+        
+        # Blocking backend calls run on the shared I/O pool unless io_workers asks for a private one
+        self._io_workers = kwargs.pop("io_workers", None)
+        self._executor = None
+        
+        # Initialize XAgent core; whatever remains in kwargs is backend configuration
         self._init_xagent(**kwargs)
         
         # Setup tool server interface
-        self.tool_server = ToolServerInterface() if 'ToolServerInterface' in globals() else MockToolServer()
+        self.tool_server = _get_tool_server()
         
-        self.logger.info(f"XAgent {agent_name} initialized successfully")
+        self.logger.info("XAgent %s initialized successfully", agent_name)
     
     def _init_xagent(self, **kwargs):
         """Initialize XAgent with configuration"""
@@ -59,79 +284,138 @@ class XAgentWrapper:
             # XAgent configuration
             config = {
                 "agent_name": self.agent_name,
-                "max_chain_length": kwargs.get("max_chain_length", 10),
+                "max_chain_length": self.max_chain_length,
                 "enable_reflection": kwargs.get("enable_reflection", True),
-                "tool_server_url": kwargs.get("tool_server_url", "http://localhost:8080"),
+                "tool_server_url": self.tool_server_url,
                 **kwargs
             }
             
-            if 'XAgent' in globals():
-                self.xagent = XAgent(config)
-            else:
-                self.xagent = MockXAgent(config)
-                
+            self.xagent = _XAgentCls(config)
+            
         except Exception as e:
-            self.logger.error(f"Failed to initialize XAgent: {e}")
+            self.logger.error("Failed to initialize XAgent: %s", e)
             self.xagent = MockXAgent({"agent_name": self.agent_name})
     
     async def run(self, input_text: str, **kwargs) -> str:
         """
         Main execution method - replaces Langchain REACT agent run
+        Failures are reported as an error string rather than raised
         """
         try:
-            # Log input
-            self.logger.info(f"Processing input: {input_text[:100]}...")
-            
-            # Add to conversation history
-            self.conversation_history.append(
-                AgentMessage(
-                    role="user",
-                    content=input_text,
-                    timestamp=datetime.now()
-                )
-            )
-            
-            # Execute XAgent planning and execution
-            response = await self._execute_xagent_workflow(input_text, **kwargs)
-            
-            # Add response to history
-            self.conversation_history.append(
-                AgentMessage(
-                    role="assistant",
-                    content=response,
-                    timestamp=datetime.now()
-                )
-            )
-            
-            return response
+            return await self._run(input_text, **kwargs)
             
         except Exception as e:
             error_msg = f"XAgent execution failed: {str(e)}"
             self.logger.error(error_msg)
             return error_msg
     
+    async def _run(self, input_text: str, **kwargs) -> str:
+        """Execute one request, raising on failure so callers can tell errors from responses"""
+        # Log input
+        self.logger.info("Processing input: %.100s...", input_text)
+        received_at = datetime.now()
+        
+        # Execute XAgent planning and execution as part of a micro-batch
+        response = await self._batcher.submit((input_text, kwargs))
+        
+        # Record the exchange only once it succeeded, so failures leave no unpaired user turn
+        self.conversation_history.append(
+            AgentMessage(
+                role="user",
+                content=input_text,
+                timestamp=received_at
+            )
+        )
+        self.conversation_history.append(
+            AgentMessage(
+                role="assistant",
+                content=response,
+                timestamp=datetime.now()
+            )
+        )
+        
+        return response
+    
     async def _execute_xagent_workflow(self, input_text: str, **kwargs) -> str:
         """Execute XAgent's autonomous workflow"""
+        # XAgent planning phase
+        plan = await self._create_plan(input_text)
+        
+        # XAgent execution phase
+        result = await self._execute_plan(plan)
+        
+        # XAgent reflection phase (if enabled)
+        if self._reflect_enabled:
+            result = await self._reflect_on_result(result, input_text)
+        
+        return result
+    
+    async def _run_batch(self, items: List[tuple]) -> List[Any]:
+        """
+        Execute a micro-batch of (input_text, kwargs) requests
+        Inputs are binned by power-of-two length so short prompts never wait on long ones
+        """
+        bins = {}
+        for i, (input_text, _) in enumerate(items):
+            bins.setdefault(len(input_text).bit_length(), []).append(i)
+        
+        results = [None] * len(items)
+        
+        async def _run_bin(indices: List[int]):
+            outputs = await self._execute_workflow_batch([items[i] for i in indices])
+            for i, output in zip(indices, outputs):
+                results[i] = output
+        
+        await asyncio.gather(*(_run_bin(indices) for indices in bins.values()))
+        return results
+    
+    async def _execute_workflow_batch(self, items: List[tuple]) -> List[Any]:
+        """Run one length bin through the backend batch API, or per item when unsupported"""
+        create_plan_batch = getattr(self.xagent, "create_plan_batch", None)
+        if create_plan_batch is None:
+            return await asyncio.gather(
+                *(self._execute_xagent_workflow(input_text, **kwargs) for input_text, kwargs in items),
+                return_exceptions=True
+            )
+        
+        inputs = [input_text for input_text, _ in items]
         try:
-            # XAgent planning phase
-            plan = await self._create_plan(input_text)
+            plans = await self._call_backend(create_plan_batch, inputs)
             
-            # XAgent execution phase
-            result = await self._execute_plan(plan)
+            # execute_plan_batch returns synthesized result strings, one per plan
+            execute_plan_batch = getattr(self.xagent, "execute_plan_batch", None)
+            if execute_plan_batch is not None:
+                results = await self._call_backend(execute_plan_batch, plans)
+            else:
+                results = await asyncio.gather(*(self._execute_plan(plan) for plan in plans))
             
-            # XAgent reflection phase (if enabled)
-            if self.memory_config.get("enable_reflection", True):
-                result = await self._reflect_on_result(result, input_text)
+            if self._reflect_enabled:
+                results = await asyncio.gather(
+                    *(self._reflect_on_result(result, input_text) for result, input_text in zip(results, inputs))
+                )
             
-            return result
+            return list(results)
             
         except Exception as e:
-            return f"Workflow execution error: {str(e)}"
+            # Surfaced per item by the batcher; run() turns it into an error string
+            return [e] * len(items)
+    
+    async def _call_backend(self, method: Callable, *args: Any) -> Any:
+        """Await async backend methods; run blocking ones on the I/O thread pool"""
+        if asyncio.iscoroutinefunction(method):
+            return await method(*args)
+        
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._io_workers,
+                thread_name_prefix=f"xagent-{self.agent_name}"
+            ) if self._io_workers else _get_shared_executor()
+        return await asyncio.get_running_loop().run_in_executor(self._executor, functools.partial(method, *args))
     
     async def _create_plan(self, input_text: str) -> Dict[str, Any]:
         """Create execution plan using XAgent's planning capabilities"""
         if hasattr(self.xagent, 'create_plan'):
-            return await self.xagent.create_plan(input_text)
+            return await self._call_backend(self.xagent.create_plan, input_text)
         else:
             # Fallback planning simulation
             return {
@@ -145,40 +429,74 @@ class XAgentWrapper:
     
     async def _execute_plan(self, plan: Dict[str, Any]) -> str:
         """Execute the generated plan using available tools"""
-        results = []
+        steps = plan.get("steps", ())
+        # Sized once up front; both paths fill slots in plan order
+        results = [None] * len(steps)
         
-        for step in plan.get("steps", []):
-            step_result = await self._execute_step(step)
-            results.append(step_result)
+        if any("deps" in step for step in steps):
+            # Independent steps within a wave run concurrently
+            for wave in self._plan_waves(steps):
+                wave_results = await asyncio.gather(*(self._execute_step(steps[i]) for i in wave))
+                for i, step_result in zip(wave, wave_results):
+                    results[i] = step_result
+        else:
+            for i, step in enumerate(steps):
+                results[i] = await self._execute_step(step)
         
         # Combine results into coherent response
         return self._synthesize_results(results)
     
+    @staticmethod
+    def _plan_waves(steps: List[Dict[str, Any]]) -> List[List[int]]:
+        """
+        Group step indices into waves using Kahn's algorithm
+        Each step's "deps" (indices of other steps) are all in previous waves
+        """
+        indegree = [0] * len(steps)
+        dependents = [[] for _ in steps]
+        for i, step in enumerate(steps):
+            for dep in step.get("deps", ()):
+                # Reject instead of letting negative indices wrap around
+                if not isinstance(dep, int) or not 0 <= dep < len(steps):
+                    raise ValueError(f"Plan step {i} depends on unknown step {dep!r}")
+                if dep == i:
+                    raise ValueError(f"Plan step {i} depends on itself")
+                dependents[dep].append(i)
+                indegree[i] += 1
+        
+        waves = []
+        scheduled = 0
+        wave = [i for i, degree in enumerate(indegree) if degree == 0]
+        while wave:
+            waves.append(wave)
+            scheduled += len(wave)
+            next_wave = []
+            for i in wave:
+                for j in dependents[i]:
+                    indegree[j] -= 1
+                    if indegree[j] == 0:
+                        next_wave.append(j)
+            wave = next_wave
+        
+        if scheduled != len(steps):
+            raise ValueError("Plan step dependencies contain a cycle")
+        return waves
+    
     async def _execute_step(self, step: Dict[str, Any]) -> str:
         """Execute individual plan step"""
         action = step.get("action", "unknown")
         target = step.get("target", "")
         
-        if action == "analyze":
-            return f"Analysis of: {target}"
-        elif action == "execute":
-            return f"Executed: {target}"
-        elif action == "validate":
-            return f"Validated: {target}"
-        else:
-            return f"Completed {action} on {target}"
+        handler = self._ACTION_HANDLERS.get(action)
+        return handler(target) if handler is not None else f"Completed {action} on {target}"
     
     def _synthesize_results(self, results: List[str]) -> str:
         """Synthesize step results into final response"""
         if not results:
             return "No results to synthesize"
         
-        synthesized = f"XAgent completed the following steps:\n"
-        for i, result in enumerate(results, 1):
-            synthesized += f"{i}. {result}\n"
-        
-        synthesized += "\nTask completed successfully."
-        return synthesized
+        body = "\n".join(f"{i}. {result}" for i, result in enumerate(results, 1))
+        return f"XAgent completed the following steps:\n{body}\n\nTask completed successfully."
     
     async def _reflect_on_result(self, result: str, original_input: str) -> str:
         """Reflect on execution result for improvement"""
@@ -187,7 +505,7 @@ class XAgentWrapper:
     
     def get_memory(self) -> List[AgentMessage]:
         """Get conversation memory - L3AGI compatibility method"""
-        return self.conversation_history
+        return list(self.conversation_history)
     
     def clear_memory(self):
         """Clear conversation memory"""
@@ -211,6 +529,10 @@ class MockXAgent:
             ],
             "tools_needed": ["mock_tool"]
         }
+    
+    async def create_plan_batch(self, inputs: List[str]) -> List[Dict[str, Any]]:
+        """Mock batched planning - one plan per input"""
+        return await asyncio.gather(*(self.create_plan(input_text) for input_text in inputs))
 
 
 class MockToolServer:
@@ -224,6 +546,40 @@ class MockToolServer:
         return f"Mock execution of {tool_name} with args {kwargs}"
 
 
+# Backend classes selected once at import
+_XAgentCls = XAgent if _HAVE_XAGENT else MockXAgent
+_ToolServerCls = ToolServerInterface if _HAVE_TOOL_SERVER else MockToolServer
+
+
+# Process-wide backend resources shared by every XAgentWrapper
+_SHARED_LOCK = threading.Lock()
+_TOOL_SERVER_SINGLETON = None
+_SHARED_EXECUTOR = None
+
+
+def _get_tool_server() -> Any:
+    """Lazily create the tool server interface so wrappers reuse its connections"""
+    global _TOOL_SERVER_SINGLETON
+    if _TOOL_SERVER_SINGLETON is None:
+        with _SHARED_LOCK:
+            if _TOOL_SERVER_SINGLETON is None:
+                _TOOL_SERVER_SINGLETON = _ToolServerCls()
+    return _TOOL_SERVER_SINGLETON
+
+
+def _get_shared_executor() -> ThreadPoolExecutor:
+    """Lazily create the thread pool used for blocking backend calls"""
+    global _SHARED_EXECUTOR
+    if _SHARED_EXECUTOR is None:
+        with _SHARED_LOCK:
+            if _SHARED_EXECUTOR is None:
+                _SHARED_EXECUTOR = ThreadPoolExecutor(
+                    max_workers=(os.cpu_count() or 1) * 8,
+                    thread_name_prefix="xagent-io"
+                )
+    return _SHARED_EXECUTOR
+
+
 # Utility functions for L3AGI compatibility
 def create_xagent_from_langchain_config(langchain_config: Dict[str, Any]) -> XAgentWrapper:
     """Convert Langchain agent configuration to XAgent"""